@@ -1,13 +1,49 @@
 import os
 import time
+import json
 import logging
-import openai
-from google import genai
-from groq import Groq
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from deadline import Deadline, ENHANCE_DEADLINE
+from score_schema import extract_json_object
+from semantic_cache import get_cache
+import metrics
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Max characters of segment text packed into one batched prompt; larger batches fan out
+BATCH_CHAR_BUDGET = int(os.getenv("ENHANCE_BATCH_CHAR_BUDGET", "6000"))
+BATCH_CONCURRENCY = int(os.getenv("ENHANCE_BATCH_CONCURRENCY", "4"))
+
+# One-line rewrite instructions per enhancement type, used when packing segments together
+BATCH_INSTRUCTIONS = {
+    "keywords": "Rewrite to include relevant keywords from the Job Description while keeping the meaning.",
+    "grammar": "Correct grammar, spelling and punctuation; improve clarity; keep a professional tone.",
+    "summary": "Write a compelling 3-4 sentence professional summary from this content.",
+    "bullet_points": "Rewrite as strong, concise, ATS-friendly bullet points with action verbs and quantified results.",
+    "general": "Rewrite to be more professional, concise and ATS-friendly, using action verbs and quantifying achievements.",
+}
+
+# Provider SDKs are heavy (~1s combined) and only needed by AI endpoints, so they
+# are imported on first use and each client is built once per API key.
+# SDK retries are off: each retry would pay the per-call timeout again outside the
+# request deadline; the provider fallback chain does the retrying under the budget.
+@lru_cache(maxsize=None)
+def _openai_client(api_key: str):
+    import openai
+    return openai.OpenAI(api_key=api_key, max_retries=0)
+
+@lru_cache(maxsize=None)
+def _gemini_client(api_key: str):
+    from google import genai
+    return genai.Client(api_key=api_key)
+
+@lru_cache(maxsize=None)
+def _groq_client(api_key: str):
+    from groq import Groq
+    return Groq(api_key=api_key, max_retries=0)
+
 class AIEnhancer:
     def __init__(self):
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
@@ -16,14 +52,15 @@ class AIEnhancer:
         
         # OpenAI
         if self.openai_api_key:
-            openai.api_key = self.openai_api_key
+            self.openai_client = _openai_client(self.openai_api_key)
             logger.info("✅ OpenAI API key loaded")
         else:
+            self.openai_client = None
             logger.warning("⚠️  OpenAI API key NOT found")
         
         # Gemini
         if self.gemini_api_key:
-            self.gemini_client = genai.Client(api_key=self.gemini_api_key)
+            self.gemini_client = _gemini_client(self.gemini_api_key)
             logger.info("✅ Gemini API key loaded")
         else:
             self.gemini_client = None
@@ -31,7 +68,7 @@ class AIEnhancer:
         
         # Groq (FREE - Llama 3.3 70B)
         if self.groq_api_key:
-            self.groq_client = Groq(api_key=self.groq_api_key)
+            self.groq_client = _groq_client(self.groq_api_key)
             logger.info("✅ Groq API key loaded (FREE tier)")
         else:
             self.groq_client = None
@@ -47,7 +84,15 @@ class AIEnhancer:
             return "openai"
         return None
 
-    def enhance_content(self, text: str, provider: str = "auto", type: str = "general", job_description: str = "") -> str:
+    @staticmethod
+    def _cache_namespace(type: str, job_description: str = "") -> str:
+        """Semantic cache partition: one per enhancement type, and per JD for keyword rewrites."""
+        if type == "keywords" and job_description:
+            from jd_registry import jd_hash
+            return f"keywords:{jd_hash(job_description)}"
+        return type if type in BATCH_INSTRUCTIONS else "general"
+
+    def enhance_content(self, text: str, provider: str = "auto", type: str = "general", job_description: str = "", deadline: Deadline = None) -> str:
         """
         Enhances the resume text using the specified AI provider and enhancement type.
         """
@@ -56,8 +101,19 @@ class AIEnhancer:
             provider = self._get_best_provider() or provider
         
         logger.info(f"📝 enhance_content called | provider={provider} | type={type} | text_length={len(text)}")
+        cache = get_cache()
+        cache_ns = self._cache_namespace(type, job_description)
+        if cache:
+            cached = cache.lookup(cache_ns, text)
+            if cached is not None:
+                logger.info(f"🧠 Semantic cache hit ({cache_ns})")
+                return cached
+        build_start = time.perf_counter()
         
         if type == "keywords" and job_description:
+             from jd_registry import registry as jd_registry
+             # Boilerplate-stripped JD, preprocessed once per distinct JD
+             job_description = jd_registry.register(job_description).clean_text
              prompt = f"""You are an ATS optimization expert. Rewrite the following text to include relevant keywords from the Job Description provided below.
 Maintain the original meaning but ensure high keyword density for ATS matching.
 IMPORTANT: Return ONLY the optimized text. Do not include any introductory or concluding remarks.
@@ -106,9 +162,107 @@ Original Text:
 
 Enhanced Text:"""
         
-        return self._call_provider(provider, prompt)
+        metrics.STAGE_SECONDS.observe(time.perf_counter() - build_start, stage="prompt_build")
+        result = self._call_provider(provider, prompt, deadline)
+        if cache and not result.startswith("Error:"):
+            cache.add(cache_ns, text, result)
+        return result
+
+    def enhance_many(self, segments: list, provider: str = "auto", job_description: str = "", deadline: Deadline = None) -> list:
+        """
+        Enhance several segments ({"id", "text", "type"}) with as few LLM calls as possible.
+        Segments are packed into one structured prompt per BATCH_CHAR_BUDGET chunk; chunks run
+        concurrently. Returns [{"index", "id", "type", "original", "enhanced"}] in input order.
+        """
+        if deadline is None:
+            deadline = Deadline(ENHANCE_DEADLINE)
+        if provider == "auto" or provider == "openai":
+            provider = self._get_best_provider() or provider
+
+        # Results are keyed by position ("key"); client ids are only echoed back, so
+        # duplicate or missing ids can never swap one segment's text into another
+        segments = [
+            {"key": str(i), "id": str(i) if seg.get("id") is None else str(seg["id"]),
+             "text": seg["text"], "type": seg.get("type") or "general"}
+            for i, seg in enumerate(segments)
+        ]
+        logger.info(f"📦 enhance_many called | provider={provider} | segments={len(segments)} | chars={sum(len(s['text']) for s in segments)}")
+
+        enhanced = {}
+        cache = get_cache()
+        if cache:
+            for seg in segments:
+                cached = cache.lookup(self._cache_namespace(seg["type"], job_description), seg["text"])
+                if cached is not None:
+                    enhanced[seg["key"]] = cached
+            if enhanced:
+                logger.info(f"🧠 Semantic cache hits for {len(enhanced)}/{len(segments)} segments")
+
+        # Greedy chunking by character budget
+        chunks, current, size = [], [], 0
+        for seg in (seg for seg in segments if seg["key"] not in enhanced):
+            if current and size + len(seg["text"]) > BATCH_CHAR_BUDGET:
+                chunks.append(current)
+                current, size = [], 0
+            current.append(seg)
+            size += len(seg["text"])
+        if current:
+            chunks.append(current)
+
+        with ThreadPoolExecutor(max_workers=max(1, min(BATCH_CONCURRENCY, len(chunks)))) as pool:
+            for result in pool.map(lambda chunk: self._enhance_chunk(chunk, provider, job_description, deadline), chunks):
+                enhanced.update(result)
 
-    def evaluate_resume(self, resume_text: str, job_description: str = "", provider: str = "auto") -> str:
+        return [
+            {"index": i, "id": seg["id"], "type": seg["type"], "original": seg["text"], "enhanced": enhanced.get(seg["key"], seg["text"])}
+            for i, seg in enumerate(segments)
+        ]
+
+    def _enhance_chunk(self, chunk: list, provider: str, job_description: str, deadline: Deadline) -> dict:
+        """Enhance one chunk of segments in a single call. Returns {key: enhanced_text}."""
+        if len(chunk) == 1:
+            seg = chunk[0]
+            return {seg["key"]: self.enhance_content(seg["text"], provider, seg["type"], job_description, deadline)}
+
+        build_start = time.perf_counter()
+        if job_description and any(seg["type"] == "keywords" for seg in chunk):
+            from jd_registry import registry as jd_registry
+            jd_context = f"Job Description:\n{jd_registry.register(job_description).clean_text}\n\n"
+        else:
+            jd_context = ""
+        items = json.dumps([
+            {"id": seg["key"], "instruction": BATCH_INSTRUCTIONS.get(seg["type"], BATCH_INSTRUCTIONS["general"]), "text": seg["text"]}
+            for seg in chunk
+        ], indent=1)
+        prompt = f"""You are a professional resume writer and ATS optimization expert.
+Apply each item's instruction to its text independently.
+Return ONLY a JSON object of the form {{"results": [{{"id": "<id>", "enhanced": "<rewritten text>"}}]}} with one entry per item.
+
+{jd_context}Items:
+{items}"""
+        metrics.STAGE_SECONDS.observe(time.perf_counter() - build_start, stage="prompt_build")
+
+        response = self._call_provider(provider, prompt, deadline, json_mode=True)
+        parsed = extract_json_object(response) or {}
+        results = {}
+        for item in parsed.get("results", []) if isinstance(parsed.get("results"), list) else []:
+            if isinstance(item, dict) and isinstance(item.get("enhanced"), str) and item.get("id") is not None:
+                results[str(item["id"])] = item["enhanced"].strip()
+        cache = get_cache()
+        if cache:
+            for seg in chunk:
+                if results.get(seg["key"]):
+                    cache.add(self._cache_namespace(seg["type"], job_description), seg["text"], results[seg["key"]])
+
+        # Anything the batch call dropped is retried one by one
+        missing = [seg for seg in chunk if seg["key"] not in results]
+        if missing:
+            logger.warning(f"⚠️  Batch response missing {len(missing)}/{len(chunk)} segments, retrying individually")
+            for seg in missing:
+                results[seg["key"]] = self.enhance_content(seg["text"], provider, seg["type"], job_description, deadline)
+        return results
+
+    def evaluate_resume(self, resume_text: str, job_description: str = "", provider: str = "auto", deadline: Deadline = None) -> str:
         """
         Evaluates the resume against a job description and returns a JSON string with score and feedback.
         """
@@ -118,6 +272,7 @@ Enhanced Text:"""
         
         logger.info(f"🔍 evaluate_resume called | provider={provider} | resume_length={len(resume_text)} | jd_length={len(job_description)}")
         
+        build_start = time.perf_counter()
         gd_context = f"Job Description: {job_description}" if job_description else "General Professional Standards"
         
         prompt = f"""Your task is to analyze the resume using Advanced Keyword Optimization criteria:
@@ -177,30 +332,64 @@ Provide the output in this STRICT JSON format:
     "feedback": ["<point_1>", "Grammar: <issue>", "Flow: <issue>"]
 }}"""
         
-        return self._call_provider(provider, prompt)
+        metrics.STAGE_SECONDS.observe(time.perf_counter() - build_start, stage="prompt_build")
+        return self._call_provider(provider, prompt, deadline, json_mode=True)
 
-    def chat_with_context(self, message: str, context: str, provider: str = "auto") -> str:
+    def chat_with_context(self, message: str, context: str, provider: str = "auto", deadline: Deadline = None,
+                          summary: str = "", history: list = None) -> str:
         """
         Chat with the AI about the resume context.
+        The resume context goes into the system message so it forms a stable prefix
+        across turns (eligible for provider prompt caching); the earlier-conversation
+        summary and recent turns follow, then the new question.
         """
         # Auto-select provider
         if provider == "auto" or provider == "openai":
             provider = self._get_best_provider() or provider
         
         logger.info(f"💬 chat_with_context called | provider={provider} | message_length={len(message)}")
+        build_start = time.perf_counter()
         
-        prompt = f"""You are a helpful AI Resume Consultant. The user has questions about their resume.
-User Question: {message}
+        system = f"""You are a helpful AI Resume Consultant. The user has questions about their resume.
+Provide helpful, professional, and concise answers.
 
 Resume Context:
-{context}
+{context}"""
+        turns = []
+        if summary:
+            turns.append({"role": "user", "content": f"Summary of our conversation so far:\n{summary}"})
+            turns.append({"role": "assistant", "content": "Understood."})
+        turns.extend(history or [])
+        metrics.STAGE_SECONDS.observe(time.perf_counter() - build_start, stage="prompt_build")
+
+        return self._call_provider(provider, message, deadline, system=system, history=turns)
 
-Provide a helpful, professional, and concise answer."""
+    def summarize_chat(self, summary: str, turns: list, provider: str = "auto") -> str:
+        """
+        Fold older chat turns into a short running summary. Returns an "Error:" string on failure.
+        """
+        transcript = "\n".join(f"{t['role'].title()}: {t['content']}" for t in turns)
+        prompt = f"""Summarize this resume-coaching conversation in under 150 words.
+Keep every concrete fact, decision and open question; drop pleasantries.
+
+Previous summary:
+{summary or "(none)"}
+
+New turns:
+{transcript}
 
-        return self._call_provider(provider, prompt)
+Return only the summary text."""
+        return self._call_provider(provider, prompt, Deadline(ENHANCE_DEADLINE))
 
-    def _call_provider(self, provider: str, prompt: str) -> str:
-        """Route to the correct provider with fallback chain."""
+    def _call_provider(self, provider: str, prompt: str, deadline: Deadline = None, json_mode: bool = False,
+                       system: str = None, history: list = None) -> str:
+        """
+        Route to the correct provider with fallback chain, bounded by the request deadline.
+        With json_mode, each provider is asked for native JSON output. `system` replaces the
+        default system message and `history` ({"role", "content"} turns) precedes the prompt.
+        """
+        if deadline is None:
+            deadline = Deadline(ENHANCE_DEADLINE)
         logger.info(f"📤 Routing to provider: {provider} (prompt: {len(prompt)} chars)")
         
         # Try requested provider first, then fallback chain
@@ -215,81 +404,133 @@ Provide a helpful, professional, and concise answer."""
             providers_to_try = ["groq", "gemini", "openai"]
         
         for p in providers_to_try:
+            if deadline.expired():
+                logger.warning(f"⏱️  Deadline exhausted before trying {p}, giving up")
+                return "Error: Request deadline exceeded."
             if p == "groq" and self.groq_client:
-                result = self._enhance_groq(prompt)
+                result = self._attempt("groq", self._enhance_groq, prompt, deadline, json_mode, system, history)
                 if not result.startswith("Error:"):
                     return result
+                metrics.PROVIDER_FALLBACKS.inc(provider="groq")
                 logger.warning(f"🔄 Groq failed, trying next provider...")
             elif p == "gemini" and self.gemini_client:
-                result = self._enhance_gemini(prompt)
+                result = self._attempt("gemini", self._enhance_gemini, prompt, deadline, json_mode, system, history)
                 if not result.startswith("Error:") and not result.startswith("Gemini Error:"):
                     return result
+                metrics.PROVIDER_FALLBACKS.inc(provider="gemini")
                 logger.warning(f"🔄 Gemini failed, trying next provider...")
             elif p == "openai" and self.openai_api_key:
-                result = self._enhance_openai(prompt)
+                result = self._attempt("openai", self._enhance_openai, prompt, deadline, json_mode, system, history)
                 if not result.startswith("OpenAI Error:"):
                     return result
+                metrics.PROVIDER_FALLBACKS.inc(provider="openai")
                 logger.warning(f"🔄 OpenAI failed, trying next provider...")
         
         logger.error("❌ All providers failed!")
         return "Error: All AI providers failed. Please check your API keys and try again."
 
-    def _enhance_groq(self, prompt: str) -> str:
+    def _attempt(self, name: str, call, prompt: str, deadline: Deadline, json_mode: bool,
+                 system: str = None, history: list = None) -> str:
+        """Run one provider attempt and record its latency and outcome."""
+        start = time.perf_counter()
+        result = call(prompt, deadline, json_mode, system, history)
+        outcome = "error" if result.startswith(("Error:", "Gemini Error:", "OpenAI Error:")) else "ok"
+        metrics.PROVIDER_SECONDS.observe(time.perf_counter() - start, provider=name, outcome=outcome)
+        return result
+
+    @staticmethod
+    def _chat_messages(default_system: str, prompt: str, system: str = None, history: list = None) -> list:
+        """OpenAI-style message list: system, prior turns, then the new user prompt."""
+        return ([{"role": "system", "content": system or default_system}]
+                + [{"role": t["role"], "content": t["content"]} for t in (history or [])]
+                + [{"role": "user", "content": prompt}])
+
+    def _enhance_groq(self, prompt: str, deadline: Deadline, json_mode: bool = False,
+                      system: str = None, history: list = None) -> str:
         """Call Groq API (FREE - Llama 3.3 70B)."""
-        logger.info("🤖 Calling Groq (Llama 3.3 70B)...")
+        logger.info(f"🤖 Calling Groq (Llama 3.3 70B, timeout {deadline.timeout():.1f}s)...")
+        extra = {"response_format": {"type": "json_object"}} if json_mode else {}
         try:
             response = self.groq_client.chat.completions.create(
                 model="llama-3.3-70b-versatile",
-                messages=[
-                    {"role": "system", "content": "You are a professional resume writing and ATS optimization expert."},
-                    {"role": "user", "content": prompt}
-                ],
+                messages=self._chat_messages(
+                    "You are a professional resume writing and ATS optimization expert.", prompt, system, history
+                ),
                 temperature=0.7,
-                max_tokens=4096
+                max_tokens=4096,
+                timeout=deadline.timeout(),
+                **extra
             )
             result = response.choices[0].message.content.strip()
+            if response.usage:
+                metrics.record_tokens("groq", response.usage.prompt_tokens, response.usage.completion_tokens)
             logger.info(f"✅ Groq response received ({len(result)} chars)")
             return result
         except Exception as e:
             logger.error(f"❌ Groq Error: {str(e)}")
             return f"Error: Groq - {str(e)}"
 
-    def _enhance_openai(self, prompt: str) -> str:
+    def _enhance_openai(self, prompt: str, deadline: Deadline, json_mode: bool = False,
+                        system: str = None, history: list = None) -> str:
         """Call OpenAI API."""
-        logger.info("🤖 Calling OpenAI GPT-3.5-Turbo...")
+        logger.info(f"🤖 Calling OpenAI GPT-3.5-Turbo (timeout {deadline.timeout():.1f}s)...")
+        extra = {"response_format": {"type": "json_object"}} if json_mode else {}
         try:
-            response = openai.chat.completions.create(
+            response = self.openai_client.chat.completions.create(
                 model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant."},
-                    {"role": "user", "content": prompt}
-                ]
+                messages=self._chat_messages("You are a helpful assistant.", prompt, system, history),
+                timeout=deadline.timeout(),
+                **extra
             )
             result = response.choices[0].message.content.strip()
+            if response.usage:
+                details = getattr(response.usage, "prompt_tokens_details", None)
+                metrics.record_tokens("openai", response.usage.prompt_tokens, response.usage.completion_tokens,
+                                      getattr(details, "cached_tokens", None))
             logger.info(f"✅ OpenAI response received ({len(result)} chars)")
             return result
         except Exception as e:
             logger.error(f"❌ OpenAI Error: {str(e)}")
             return f"OpenAI Error: {str(e)}"
 
-    def _enhance_gemini(self, prompt: str) -> str:
+    def _enhance_gemini(self, prompt: str, deadline: Deadline, json_mode: bool = False,
+                        system: str = None, history: list = None) -> str:
         """Call Google Gemini API with retry on rate limiting."""
+        from google.genai import types
         max_retries = 2
+        contents = prompt
+        if history:
+            contents = [
+                types.Content(role="model" if t["role"] == "assistant" else "user", parts=[types.Part(text=t["content"])])
+                for t in history
+            ] + [types.Content(role="user", parts=[types.Part(text=prompt)])]
         
         for attempt in range(1, max_retries + 1):
-            logger.info(f"🤖 Calling Gemini 2.0 Flash (attempt {attempt}/{max_retries})...")
+            logger.info(f"🤖 Calling Gemini 2.0 Flash (attempt {attempt}/{max_retries}, timeout {deadline.timeout():.1f}s)...")
             try:
                 response = self.gemini_client.models.generate_content(
                     model="gemini-2.0-flash",
-                    contents=prompt
+                    contents=contents,
+                    config=types.GenerateContentConfig(
+                        http_options=types.HttpOptions(timeout=int(deadline.timeout() * 1000)),
+                        system_instruction=system,
+                        response_mime_type="application/json" if json_mode else None
+                    )
                 )
                 result = response.text.strip()
+                usage = response.usage_metadata
+                if usage:
+                    metrics.record_tokens("gemini", usage.prompt_token_count, usage.candidates_token_count,
+                                          usage.cached_content_token_count)
                 logger.info(f"✅ Gemini response received ({len(result)} chars)")
                 return result
             except Exception as e:
                 error_str = str(e)
                 if "429" in error_str or "RESOURCE_EXHAUSTED" in error_str:
                     wait_time = 15 * attempt
+                    if attempt == max_retries or wait_time >= deadline.remaining() - Deadline.MIN_CALL_BUDGET:
+                        logger.warning(f"⏳ Gemini rate limited, no budget left to wait {wait_time}s")
+                        break
                     logger.warning(f"⏳ Gemini rate limited. Waiting {wait_time}s...")
                     time.sleep(wait_time)
                 else:
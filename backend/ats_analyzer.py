@@ -3,19 +3,21 @@ import re
 class ATSAnalyzer:
     def __init__(self):
         self.required_sections = ["experience", "education", "skills"]
-        self.risky_fonts = ["Comic Sans", "Papyrus", "Impact"] # Placeholder, real font check needs PDF analysis complexity
+        self.risky_fonts = ["Comic Sans", "Papyrus", "Impact"] # Checked against layout["fonts"] (layout-aware PDF parsing)
         self.buzzwords = ["team player", "hard worker", "fast learner", "go-getter", "synergy"]
 
     def analyze_mechanical_compliance(self, text: str, metadata: dict = None) -> dict:
+        layout = (metadata or {}).get("layout")
         results = {
             "parsing_valid": self._validate_parsing(text),
             "section_headers": self._check_section_headers(text),
             "contact_info": self._validate_contact_info(text),
             "formatting": self._analyze_formatting(text),
             "buzzwords": self._check_buzzwords(text),
-            "page_check": self._estimate_page_count(text),
+            "page_check": self._estimate_page_count(text, layout),
             "date_consistency": self._check_date_consistency(text),
-            "complex_layout": self._detect_tables_columns(text),
+            "complex_layout": self._detect_tables_columns(text, layout),
+            "fonts": self._check_fonts(layout),
             "special_chars": self._check_special_chars(text),
             "file_size_check": self._check_file_size(metadata.get("file_size", 0) if metadata else 0)
         }
@@ -35,7 +37,7 @@ class ATSAnalyzer:
         # Penalties/Bonuses
         if results["page_check"]["is_appropriate_length"]: score += 10
         if results["date_consistency"]["is_consistent"]: score += 5
-        if not results["complex_layout"]["potential_tables"]: score += 5 
+        if not results["complex_layout"]["potential_tables"] and results["complex_layout"]["columns"] == 1: score += 5 
         
         # New Checks
         if not results["special_chars"]["has_special_chars"]: score += 10
@@ -44,6 +46,7 @@ class ATSAnalyzer:
         # Penalty for key buzzwords
         buzzword_count = len(results["buzzwords"])
         score -= min(buzzword_count * 2, 10) 
+        score -= 5 if results["fonts"]["risky_fonts"] else 0
         
         results["mechanical_score"] = max(0, min(int(score + 15), 100))
         return results
@@ -109,10 +112,12 @@ class ATSAnalyzer:
             "bullet_ratio": round(bullet_ratio, 2)
         }
     
-    def _estimate_page_count(self, text: str) -> dict:
+    def _estimate_page_count(self, text: str, layout: dict = None) -> dict:
         word_count = len(text.split())
-        # Avg words per page ~400-600 for resumes
-        estimated_pages = word_count / 400
+        # Avg words per page ~400-600 for resumes; the real page count when layout is known
+        estimated_pages = layout.get("pages") if layout else None
+        if not estimated_pages:
+            estimated_pages = word_count / 400
         
         is_appropriate = 0.5 <= estimated_pages <= 2.5 # 1-2 pages ideally
         
@@ -149,7 +154,18 @@ class ATSAnalyzer:
             "mixed_usage_warning": not is_consistent
         }
 
-    def _detect_tables_columns(self, text: str) -> dict:
+    def _detect_tables_columns(self, text: str, layout: dict = None) -> dict:
+        if layout:
+            # Measured from text positions (layout-aware parsing)
+            tables = layout.get("tables", [])
+            return {
+                "potential_tables": bool(tables),
+                "lines_with_gaps": sum(t["rows"] for t in tables),
+                "columns": layout.get("columns", 1),
+                "table_regions": tables,
+                "source": "layout"
+            }
+
         # Heuristic: Short lines alternating frequently or lots of spacing gaps
         # Hard to detect strictly from string without layout coordinates (which parsing libraries lose)
         # But we can check for "Column-like" artifacts:
@@ -163,7 +179,21 @@ class ATSAnalyzer:
         
         return {
             "potential_tables": potential_tables,
-            "lines_with_gaps": len(lines_with_gaps)
+            "lines_with_gaps": len(lines_with_gaps),
+            "columns": 1,
+            "table_regions": [],
+            "source": "text"
+        }
+
+    def _check_fonts(self, layout: dict = None) -> dict:
+        if not layout:
+            return {"fonts": [], "risky_fonts": [], "feedback": "Skipped (needs layout-aware PDF parsing)"}
+        fonts = [f["name"] for f in layout.get("fonts", [])]
+        risky = [f for f in fonts if any(r.lower().replace(" ", "") in f.lower().replace(" ", "") for r in self.risky_fonts)]
+        return {
+            "fonts": fonts,
+            "risky_fonts": risky,
+            "feedback": f"Replace hard-to-parse fonts: {', '.join(risky)}" if risky else "Fonts OK"
         }
 
     def _check_buzzwords(self, text: str) -> list:
@@ -1,58 +1,237 @@
-import json
+import os
 import re
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
 from ai_enhancer import AIEnhancer
+from deadline import Deadline, SCORE_DEADLINE
+from score_schema import parse_ai_score
+from metrics import timed
+from jd_registry import registry as jd_registry
+
+# Max concurrent AI evaluations for multi-JD scoring
+MULTI_JD_AI_CONCURRENCY = int(os.getenv("MULTI_JD_AI_CONCURRENCY", "3"))
+_TOKEN_RE = re.compile(r"[a-z][a-z0-9+#.]*[a-z0-9+#]|[a-z]")
 
 class ATSScorer:
     REQUIRED_SECTIONS = ["education", "experience", "skills", "projects", "summary"]
     
     @staticmethod
-    def calculate_score(resume_text: str, job_description: str = "", metadata: dict = None) -> dict:
+    def calculate_score(resume_text: str, job_description: str = "", metadata: dict = None, deadline: Deadline = None) -> dict:
         """
         Orchestrates the full Resume Analysis:
         1. Mechanical/Compliance Checks (ATSAnalyzer)
         2. Advanced AI Scoring (AIEnhancer)
         3. Combines results into a single comprehensive report.
+
+        AI scoring only runs while the deadline has budget left; otherwise
+        the heuristic fallback is returned.
+        """
+        for stage, payload in ATSScorer.iter_score(resume_text, job_description, metadata, deadline):
+            if stage == "score":
+                return payload
+
+    @staticmethod
+    def iter_score(resume_text: str, job_description: str = "", metadata: dict = None, deadline: Deadline = None):
+        """
+        Same pipeline as calculate_score, yielding partial results as they are ready:
+        ("mechanical", compliance results) then ("score", final report).
+        The AI evaluation is started before the mechanical checks and runs alongside them.
         """
-        # 1. Mechanical Checks
+        if deadline is None:
+            deadline = Deadline(SCORE_DEADLINE)
+
         from ats_analyzer import ATSAnalyzer # Local import to avoid circular dependency
         analyzer = ATSAnalyzer()
-        mechanical_results = analyzer.analyze_mechanical_compliance(resume_text, metadata)
-        
-        # 0. Fail Fast Validation
+
+        # Not a `with` block: leaving it would wait for an AI call that overran the deadline
+        pool = ThreadPoolExecutor(max_workers=1)
+        try:
+            # 0. Fail Fast Validation - don't pay for an AI call on unreadable input
+            ai_future = None
+            if analyzer._validate_parsing(resume_text):
+                ai_future = pool.submit(ATSScorer._ai_evaluate, resume_text, job_description, deadline)
+
+            # 1. Mechanical Checks
+            with timed("mechanical_analysis"):
+                mechanical_results = analyzer.analyze_mechanical_compliance(resume_text, metadata)
+            yield "mechanical", mechanical_results
+
+            if ai_future is None:
+                yield "score", ATSScorer._invalid_result(mechanical_results)
+                return
+
+            # 2. AI Scoring (already in flight), bounded by what is left of the deadline
+            ai_results = ATSScorer._await_ai(ai_future, deadline)
+        finally:
+            pool.shutdown(wait=False)
+
+        # 3. Combine Results
+        yield "score", ATSScorer._combine(resume_text, job_description, mechanical_results, ai_results)
+
+    @staticmethod
+    def score_checked(resume_text: str, job_description: str, mechanical_results: dict, deadline: Deadline = None, use_ai: bool = True) -> dict:
+        """
+        Final report for a resume whose mechanical checks already ran elsewhere
+        (e.g. in a bulk parse worker process). use_ai=False skips the LLM entirely.
+        """
         if not mechanical_results["parsing_valid"]:
-             return {
-                "score": 0,
-                "summary": "Content too short or unreadable.",
-                "section_scores": {
-                    "experience": 0,
-                    "skills": 0,
-                    "education": 0,
-                    "formatting": 0,
-                    "mechanical_compliance": 0
-                },
-                "keywords": {"critical_missing": [], "recommended_missing": []},
-                "content_analysis": {},
-                "compliance": mechanical_results,
-                "feedback": ["Input is too short to analyze.", "Please upload a valid resume with at least 50 words."]
-            }
+            return ATSScorer._invalid_result(mechanical_results)
+        ai_results = ATSScorer._ai_evaluate(resume_text, job_description, deadline or Deadline(SCORE_DEADLINE)) if use_ai else {}
+        return ATSScorer._combine(resume_text, job_description, mechanical_results, ai_results)
+
+    @staticmethod
+    def score_many(resume_text: str, job_descriptions: list, metadata: dict = None, top_k: int = 3, deadline: Deadline = None) -> dict:
+        """
+        Rank one resume against many job descriptions.
+        Mechanical compliance runs once; local relevance is computed for every JD in
+        one vectorized pass; only the top_k most relevant JDs get an AI evaluation.
+        """
+        if deadline is None:
+            deadline = Deadline(SCORE_DEADLINE)
+
+        from ats_analyzer import ATSAnalyzer # Local import to avoid circular dependency
+        with timed("mechanical_analysis"):
+            mechanical_results = ATSAnalyzer().analyze_mechanical_compliance(resume_text, metadata)
+
+        if not mechanical_results["parsing_valid"] or not job_descriptions:
+            invalid = ATSScorer._invalid_result(mechanical_results)
+            return {"compliance": invalid.pop("compliance"), "results": [
+                {"index": i, "relevance": 0.0, "ai_evaluated": False, **invalid} for i in range(len(job_descriptions))
+            ]}
+
+        with timed("jd_relevance"):
+            relevance = ATSScorer._jd_relevance(resume_text, job_descriptions)
+        # Shortlist the top_k distinct JD texts (duplicates share one evaluation)
+        shortlisted = []
+        for i in sorted(range(len(job_descriptions)), key=lambda i: -relevance[i]):
+            if len(shortlisted) >= max(0, top_k):
+                break
+            if job_descriptions[i] not in shortlisted:
+                shortlisted.append(job_descriptions[i])
 
-        # 2. AI Scoring
+        ai_results = {}
+        if shortlisted:
+            pool = ThreadPoolExecutor(max_workers=max(1, min(MULTI_JD_AI_CONCURRENCY, len(shortlisted))))
+            try:
+                futures = {jd: pool.submit(ATSScorer._ai_evaluate, resume_text, jd, deadline) for jd in shortlisted}
+                ai_results = {jd: ATSScorer._await_ai(f, deadline) for jd, f in futures.items()}
+            finally:
+                pool.shutdown(wait=False)
+
+        results = []
+        for i, jd in enumerate(job_descriptions):
+            report = ATSScorer._combine(resume_text, jd, mechanical_results, ai_results.get(jd, {}))
+            report.pop("compliance")
+            if not ai_results.get(jd):
+                # Not AI-scored (outside top_k or AI failed): rank on the JD-specific relevance
+                mech_score = mechanical_results.get("mechanical_score", 0)
+                report["score"] = int(mech_score * 0.4 + relevance[i] * 0.6)
+                report["summary"] = "Not AI-evaluated. Score based on mechanical checks and JD relevance."
+                report["section_scores"] = {"mechanical_compliance": mech_score, "jd_relevance": relevance[i]}
+            results.append({"index": i, "relevance": relevance[i], "ai_evaluated": bool(ai_results.get(jd)), **report})
+        # AI-evaluated rows first: their scores are not comparable with the relevance-based ones
+        results.sort(key=lambda row: (not row["ai_evaluated"], -row["score"], -row["relevance"]))
+        return {"compliance": mechanical_results, "results": results}
+
+    @staticmethod
+    def _jd_relevance(resume_text: str, job_descriptions: list) -> list:
+        """
+        Local resume-vs-JD relevance (0-100) for all JDs at once:
+        60% JD keyword coverage + 40% TF-IDF cosine similarity.
+        """
+        import numpy as np
+
+        jds = [jd_registry.register(jd) for jd in job_descriptions]
+        jd_tokens = [Counter(_TOKEN_RE.findall(jd.clean_text.lower())) for jd in jds]
+        jd_keywords = [{k.lower() for k in jd.keywords} for jd in jds]
+        resume_tokens = Counter(_TOKEN_RE.findall(resume_text.lower()))
+
+        vocab = {}
+        for counts in jd_tokens:
+            for tok in counts:
+                vocab.setdefault(tok, len(vocab))
+        if not vocab:
+            return [0.0] * len(job_descriptions)
+
+        # JD x vocab term-frequency matrix, resume term vector
+        tf = np.zeros((len(job_descriptions), len(vocab)), dtype=np.float32)
+        for row, counts in enumerate(jd_tokens):
+            for tok, n in counts.items():
+                tf[row, vocab[tok]] = n
+        resume_vec = np.zeros(len(vocab), dtype=np.float32)
+        for tok, idx in vocab.items():
+            resume_vec[idx] = resume_tokens.get(tok, 0)
+
+        # TF-IDF cosine across all JDs in one matrix-vector product
+        df = (tf > 0).sum(axis=0)
+        idf = np.log((1 + len(job_descriptions)) / (1 + df)) + 1.0
+        jd_mat = tf * idf
+        res = resume_vec * idf
+        norms = np.linalg.norm(jd_mat, axis=1) * (np.linalg.norm(res) or 1.0)
+        cosine = (jd_mat @ res) / np.where(norms == 0, 1.0, norms)
+
+        # Keyword coverage as a binary mask product
+        kw_mask = np.zeros_like(tf)
+        for row, kws in enumerate(jd_keywords):
+            for kw in kws:
+                if kw in vocab:
+                    kw_mask[row, vocab[kw]] = 1.0
+        kw_total = kw_mask.sum(axis=1)
+        coverage = (kw_mask @ (resume_vec > 0).astype(np.float32)) / np.where(kw_total == 0, 1.0, kw_total)
+
+        scores = (0.6 * coverage + 0.4 * cosine) * 100
+        return [round(float(s), 1) for s in scores]
+
+    @staticmethod
+    def _invalid_result(mechanical_results: dict) -> dict:
+        return {
+            "score": 0,
+            "summary": "Content too short or unreadable.",
+            "section_scores": {
+                "experience": 0,
+                "skills": 0,
+                "education": 0,
+                "formatting": 0,
+                "mechanical_compliance": 0
+            },
+            "keywords": {"critical_missing": [], "recommended_missing": []},
+            "content_analysis": {},
+            "compliance": mechanical_results,
+            "feedback": ["Input is too short to analyze.", "Please upload a valid resume with at least 50 words."]
+        }
+
+    @staticmethod
+    def _await_ai(future, deadline: Deadline) -> dict:
+        """AI results if they arrive before the deadline, else {} (heuristic fallback)."""
+        try:
+            return future.result(timeout=max(deadline.remaining(), 0.0))
+        except FuturesTimeout:
+            print("AI Scoring failed: deadline exhausted while waiting for the provider")
+            return {}
+
+    @staticmethod
+    def _ai_evaluate(resume_text: str, job_description: str, deadline: Deadline) -> dict:
+        """Run the AI evaluation and return validated results, or {} on any failure."""
         ai_results = {}
         try:
+            if deadline.expired():
+                raise TimeoutError("deadline exhausted before AI scoring")
             enhancer = AIEnhancer()
+            # Send the boilerplate-stripped JD; the registry caches preprocessing per JD
+            jd_text = jd_registry.register(job_description).clean_text if job_description else ""
             # Let AIEnhancer auto-select the best available provider (Groq > Gemini > OpenAI)
-            ai_response = enhancer.evaluate_resume(resume_text, job_description, "auto")
-            if ai_response and ai_response.startswith("{"):
-                # Clean up potential markdown code blocks
-                clean_json = ai_response.replace("```json", "").replace("```", "").strip()
-                ai_results = json.loads(clean_json)
+            ai_response = enhancer.evaluate_resume(resume_text, jd_text, "auto", deadline)
+            if ai_response and not ai_response.startswith("Error:"):
+                parsed = parse_ai_score(ai_response)
+                if parsed:
+                    ai_results = parsed.model_dump()
         except Exception as e:
             print(f"AI Scoring failed: {e}")
             # Fallback to empty AI results
-        
-        # 3. Combine Results
-        
+        return ai_results
+
+    @staticmethod
+    def _combine(resume_text: str, job_description: str, mechanical_results: dict, ai_results: dict) -> dict:
         # Scenario A: AI Scored Successfully
         if ai_results:
             # Weighted combination: AI Score * 0.8 + Mechanical Score * 0.2
@@ -93,21 +272,27 @@ class ATSScorer:
 
     @staticmethod
     def _heuristic_score(resume_text: str, job_description: str) -> int:
+        """
+        Fallback estimate when AI scoring is unavailable, capped at 85 so it stays in the range
+        of AI scores: 50 + up to 20 for sections; with a JD, half keyword coverage is neutral.
+        """
         score = 50
         text_lower = resume_text.lower()
         
         # Keywords
         if job_description:
-            keywords = ATSScorer._extract_keywords(job_description)
-            matched = [k for k in keywords if k in text_lower]
+            keywords = jd_registry.register(job_description).keywords
+            tokens = set(_TOKEN_RE.findall(text_lower))
+            # JD keywords keep their original case; match whole words, phrases as substrings
+            matched = [k for k in keywords if (k.lower() in tokens if " " not in k else k.lower() in text_lower)]
             if keywords:
-                score += (len(matched) / len(keywords)) * 30
+                score = 30 + (len(matched) / len(keywords)) * 40
         
         # Sections
         found_sections = sum(1 for s in ATSScorer.REQUIRED_SECTIONS if s in text_lower)
         score += (found_sections / len(ATSScorer.REQUIRED_SECTIONS)) * 20
         
-        return min(int(score), 100)
+        return min(int(score), 85)
 
     @staticmethod
     def _extract_keywords(text: str) -> list:
@@ -0,0 +1,198 @@
+"""
+End-to-end benchmark harness.
+
+Runs each pipeline stage (ResumeParser, ATSAnalyzer, ATSScorer, AIEnhancer,
+PDFGenerator) and each HTTP endpoint over a synthetic resume corpus, with all
+AI providers pointed at a local fake server. Reports throughput and
+p50/p95/p99 latency, and can gate on regressions against a saved baseline.
+
+Usage (from backend/):
+    python benchmarks/bench.py --iterations 20 --latency 0.05
+    python benchmarks/bench.py --save benchmarks/baseline.json
+    python benchmarks/bench.py --compare benchmarks/baseline.json --max-regression 0.25
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_llm import FakeLLMServer, parse_rate_limits
+from corpus import build_corpus, JOB_DESCRIPTION
+
+
+def percentile(samples: list, pct: float) -> float:
+    """Nearest-rank percentile."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, int(round(pct / 100.0 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(samples: list, wall: float) -> dict:
+    return {
+        "n": len(samples),
+        "throughput": round(len(samples) / wall, 2) if wall else 0.0,
+        "p50_ms": round(percentile(samples, 50) * 1000, 2),
+        "p95_ms": round(percentile(samples, 95) * 1000, 2),
+        "p99_ms": round(percentile(samples, 99) * 1000, 2),
+    }
+
+
+def measure(fn, items: list, iterations: int, concurrency: int = 1) -> dict:
+    """Call fn(item) iterations times per item, return latency/throughput summary."""
+    work = [item for _ in range(iterations) for item in items]
+
+    def timed_call(item):
+        start = time.perf_counter()
+        fn(item)
+        return time.perf_counter() - start
+
+    wall_start = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            samples = list(pool.map(timed_call, work))
+    else:
+        samples = [timed_call(item) for item in work]
+    return summarize(samples, time.perf_counter() - wall_start)
+
+
+def run(args) -> dict:
+    server = FakeLLMServer(latency=args.latency, rate_limit=parse_rate_limits(args.rate_limit), jitter=args.jitter).start()
+    os.environ.update(server.env())
+
+    # Import after the environment points at the fake server
+    import main
+    os.environ.update(server.env())  # main loads .env with override=True
+    from fastapi.testclient import TestClient
+    from resume_parser import ResumeParser
+    from ats_analyzer import ATSAnalyzer
+    from ats_scorer import ATSScorer
+    from ai_enhancer import AIEnhancer
+    from pdf_generator import PDFGenerator
+
+    logging.getLogger().setLevel(logging.WARNING)
+    has_latex = bool(shutil.which("pdflatex"))
+    workdir = tempfile.mkdtemp(prefix="resume-bench-")
+    corpus = build_corpus(workdir, args.per_size)
+    client = TestClient(main.app)
+    results = {"stages": {}, "endpoints": {}, "config": vars(args), "pdflatex": has_latex}
+
+    def add(kind: str, name: str, size: str, summary: dict):
+        results[kind].setdefault(name, {})[size] = summary
+        print(f"  {kind[:-1]:<8} {name:<18} {size:<7} n={summary['n']:<5} "
+              f"{summary['throughput']:>8.2f}/s  p50={summary['p50_ms']:>9.2f}ms  "
+              f"p95={summary['p95_ms']:>9.2f}ms  p99={summary['p99_ms']:>9.2f}ms")
+
+    try:
+        sizes = sorted({c[0] for c in corpus}, key=lambda s: ["small", "medium", "large"].index(s))
+        for size in sizes:
+            items = [c for c in corpus if c[0] == size]
+            it = args.iterations
+
+            # --- Stages (in-process, sequential) ---
+            add("stages", "parse_docx", size, measure(lambda c: ResumeParser.extract_data(c[3]), items, it))
+            add("stages", "mechanical", size, measure(
+                lambda c: ATSAnalyzer().analyze_mechanical_compliance(c[2], {"file_size": 40000}), items, it))
+            add("stages", "score", size, measure(
+                lambda c: ATSScorer.calculate_score(c[2], JOB_DESCRIPTION, {"file_size": 40000}), items, it))
+            add("stages", "enhance", size, measure(
+                lambda c: AIEnhancer().enhance_content(c[1]["summary"], "auto", "bullet_points"), items, it))
+            add("stages", "generate_docx", size, measure(
+                lambda c: PDFGenerator().generate_resume(c[1], "docx"), items, it))
+            add("stages", "generate_native", size, measure(
+                lambda c: PDFGenerator().generate_resume(c[1], "pdf", "classic", "native"), items, it))
+            if has_latex:
+                add("stages", "generate_pdf", size, measure(
+                    lambda c: PDFGenerator().generate_resume(c[1], "pdf", "classic", "latex"), items, max(1, it // 5)))
+
+            # --- Endpoints (through FastAPI, optionally concurrent) ---
+            conc = args.concurrency
+
+            def post_parse(c):
+                with open(c[3], "rb") as f:
+                    client.post("/parse", files={"file": (os.path.basename(c[3]), f)}).raise_for_status()
+
+            add("endpoints", "/parse", size, measure(post_parse, items, it, conc))
+            add("endpoints", "/score", size, measure(lambda c: client.post("/score", json={
+                "resume_text": c[2], "job_description": JOB_DESCRIPTION, "metadata": {"file_size": 40000}
+            }).raise_for_status(), items, it, conc))
+            add("endpoints", "/enhance", size, measure(lambda c: client.post("/enhance", json={
+                "text": c[1]["summary"], "type": "bullet_points"
+            }).raise_for_status(), items, it, conc))
+            add("endpoints", "/enhance/batch", size, measure(lambda c: client.post("/enhance/batch", json={
+                "segments": [{"id": "summary", "text": c[1]["summary"], "type": "summary"}] + [
+                    {"id": f"exp-{i}", "text": "\n".join(job["details"]), "type": "bullet_points"}
+                    for i, job in enumerate(c[1]["experience"])
+                ]
+            }).raise_for_status(), items, it, conc))
+            add("endpoints", "/chat", size, measure(lambda c: client.post("/chat", json={
+                "message": "How can I improve my summary?", "context": c[2]
+            }).raise_for_status(), items, it, conc))
+            add("endpoints", "/generate(docx)", size, measure(lambda c: client.post("/generate", json={
+                "data": c[1], "format": "docx"
+            }).raise_for_status(), items, it, conc))
+            add("endpoints", "/generate(native)", size, measure(lambda c: client.post("/generate", json={
+                "data": c[1], "format": "pdf", "renderer": "native"
+            }).raise_for_status(), items, it, conc))
+    finally:
+        server.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    results["fake_llm"] = {"calls": server.calls, "throttled": server.throttled}
+    print(f"\n  fake LLM calls: {server.calls} | throttled (429): {server.throttled}")
+    if not has_latex:
+        print("  pdflatex not found: PDF render stage skipped")
+    return results
+
+
+def compare(results: dict, baseline: dict, max_regression: float) -> list:
+    """Return a list of p95 regressions beyond the allowed ratio."""
+    regressions = []
+    for kind in ("stages", "endpoints"):
+        for name, by_size in baseline.get(kind, {}).items():
+            for size, base in by_size.items():
+                current = results.get(kind, {}).get(name, {}).get(size)
+                if not current or not base["p95_ms"]:
+                    continue
+                ratio = current["p95_ms"] / base["p95_ms"]
+                if ratio > 1 + max_regression:
+                    regressions.append(f"{kind}/{name}/{size}: p95 {base['p95_ms']}ms -> {current['p95_ms']}ms (x{ratio:.2f})")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resume pipeline benchmark with a fake LLM provider")
+    parser.add_argument("--iterations", type=int, default=10, help="Runs per resume per stage")
+    parser.add_argument("--per-size", type=int, default=3, help="Synthetic resumes per size bucket")
+    parser.add_argument("--concurrency", type=int, default=1, help="Parallel clients for endpoint runs")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake provider latency (seconds)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random fake provider latency (seconds)")
+    parser.add_argument("--rate-limit", nargs="*", default=[], help="provider=probability of HTTP 429, e.g. groq=0.1")
+    parser.add_argument("--save", help="Write results JSON to this path")
+    parser.add_argument("--compare", help="Baseline results JSON to gate against")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="Allowed p95 slowdown ratio vs baseline")
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"  results saved to {args.save}")
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.max_regression)
+        if regressions:
+            print("\n❌ Performance regressions:")
+            for line in regressions:
+                print(f"   {line}")
+            sys.exit(1)
+        print("\n✅ No p95 regressions beyond threshold")
@@ -0,0 +1,118 @@
+"""
+Synthetic resume corpus for benchmarks.
+Builds ResumeData-shaped dicts of varying size, their plain-text rendering,
+and DOCX files that ResumeParser can read back.
+"""
+import os
+import random
+from docx import Document
+
+SIZES = {
+    # name: (jobs, bullets per job, projects, education entries)
+    "small": (2, 3, 1, 1),
+    "medium": (5, 5, 3, 2),
+    "large": (12, 8, 8, 3),
+}
+
+ROLES = ["Software Engineer", "Data Scientist", "Backend Developer", "ML Engineer", "DevOps Engineer", "Product Analyst"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Stark Industries", "Wayne Enterprises"]
+VERBS = ["Developed", "Designed", "Led", "Optimized", "Automated", "Migrated", "Built", "Reduced", "Scaled"]
+TECH = ["Python", "FastAPI", "React", "Docker", "Kubernetes", "PostgreSQL", "AWS", "Redis", "TensorFlow", "Go", "Kafka"]
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+JOB_DESCRIPTION = """Senior Backend Engineer
+We are looking for an engineer with strong Python, FastAPI and PostgreSQL experience.
+Must have: Docker, Kubernetes, AWS, CI/CD pipelines, REST API design.
+Nice to have: Kafka, Redis, Terraform, React.
+You will own services end to end, mentor engineers and improve reliability."""
+
+
+def _bullet(rng: random.Random) -> str:
+    return (f"{rng.choice(VERBS)} {rng.choice(TECH)} services with {rng.choice(TECH)}, "
+            f"improving throughput by {rng.randint(10, 90)}% for {rng.randint(2, 50)}k users")
+
+
+def _dates(rng: random.Random) -> str:
+    start = rng.randint(2012, 2021)
+    return f"{rng.choice(MONTHS)} {start} - {rng.choice(MONTHS)} {start + rng.randint(1, 3)}"
+
+
+def make_resume(size: str, seed: int = 0) -> dict:
+    """Return a ResumeData-compatible dict for the given size bucket."""
+    jobs, bullets, projects, schools = SIZES[size]
+    rng = random.Random(f"{size}-{seed}")
+    return {
+        "name": f"Candidate {size.title()} {seed}",
+        "email": f"candidate{seed}@example.com",
+        "phone": "+1 415 555 0199",
+        "location": "San Francisco, CA",
+        "linkedin": f"linkedin.com/in/candidate{seed}",
+        "github": f"github.com/candidate{seed}",
+        "summary": " ".join(_bullet(rng) + "." for _ in range(3)),
+        "experience": [
+            {
+                "role": rng.choice(ROLES),
+                "company": rng.choice(COMPANIES),
+                "dates": _dates(rng),
+                "location": "Remote",
+                "details": [_bullet(rng) for _ in range(bullets)],
+            }
+            for _ in range(jobs)
+        ],
+        "projects": [
+            {
+                "name": f"Project {i}",
+                "tech": ", ".join(rng.sample(TECH, 3)),
+                "details": [_bullet(rng) for _ in range(2)],
+            }
+            for i in range(projects)
+        ],
+        "education": [
+            {
+                "degree": "B.S. Computer Science",
+                "school": f"State University {i}",
+                "dates": _dates(rng),
+                "location": "CA",
+            }
+            for i in range(schools)
+        ],
+        "skills": {"Languages": rng.sample(TECH, 4), "Tools": rng.sample(TECH, 4)},
+    }
+
+
+def to_text(data: dict) -> str:
+    """Plain-text rendering, roughly what ResumeParser extracts from a real file."""
+    lines = [data["name"], f"{data['email']} | {data['phone']} | {data['location']}",
+             data["linkedin"], data["github"], "", "Summary", data["summary"], "", "Experience"]
+    for job in data["experience"]:
+        lines.append(f"{job['role']} at {job['company']}    {job['dates']}")
+        lines.extend(f"• {d}" for d in job["details"])
+    lines += ["", "Projects"]
+    for proj in data["projects"]:
+        lines.append(f"{proj['name']} ({proj['tech']})")
+        lines.extend(f"• {d}" for d in proj["details"])
+    lines += ["", "Education"]
+    for edu in data["education"]:
+        lines.append(f"{edu['degree']} - {edu['school']}    {edu['dates']}")
+    lines += ["", "Skills"]
+    lines.extend(f"{cat}: {', '.join(items)}" for cat, items in data["skills"].items())
+    return "\n".join(lines)
+
+
+def write_docx(data: dict, directory: str) -> str:
+    doc = Document()
+    for line in to_text(data).split("\n"):
+        doc.add_paragraph(line)
+    path = os.path.join(directory, f"{data['name'].replace(' ', '_')}.docx")
+    doc.save(path)
+    return path
+
+
+def build_corpus(directory: str, per_size: int = 3) -> list:
+    """Write DOCX files for every size bucket. Returns [(size, data, text, docx_path)]."""
+    corpus = []
+    for size in SIZES:
+        for seed in range(per_size):
+            data = make_resume(size, seed)
+            corpus.append((size, data, to_text(data), write_docx(data, directory)))
+    return corpus
@@ -0,0 +1,178 @@
+"""
+Local stub server emulating the Groq, OpenAI and Gemini HTTP APIs.
+
+Point the SDKs at it through their own base-URL environment variables
+(GROQ_BASE_URL, OPENAI_BASE_URL, GOOGLE_GEMINI_BASE_URL); see
+FakeLLMServer.env(). Latency and 429 rate are configurable per provider.
+
+Run standalone:
+    python benchmarks/fake_llm.py --port 9100 --latency 0.3 --rate-limit groq=0.2
+"""
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PROVIDERS = ("groq", "openai", "gemini")
+
+SCORE_RESPONSE = {
+    "score": 78,
+    "summary": "Solid backend profile with minor keyword gaps.",
+    "section_scores": {"experience": 80, "skills": 75, "education": 70, "formatting": 85},
+    "keywords": {
+        "critical_missing": ["Terraform"],
+        "recommended_missing": ["CI/CD"],
+        "hard_skills": ["Python", "Docker", "AWS"],
+        "soft_skills": ["Mentoring"],
+        "keyword_stuffing_detected": [],
+        "acronym_warnings": [],
+    },
+    "content_analysis": {"action_verbs": "Strong", "quantification_score": 8},
+    "feedback": ["Add Terraform experience", "Grammar: OK", "Flow: OK"],
+}
+
+
+def _reply(prompt: str) -> str:
+    if "STRICT JSON" in prompt:
+        return json.dumps(SCORE_RESPONSE)
+    if "Items:\n" in prompt:
+        # Batched enhancement: echo every item back under its id
+        items = json.loads(prompt.split("Items:\n", 1)[1])
+        return json.dumps({"results": [{"id": it["id"], "enhanced": f"Enhanced: {it['text']}"} for it in items]})
+    return f"Enhanced: {prompt[-200:]}"
+
+
+class FakeLLMServer:
+    def __init__(self, port: int = 0, latency: float = 0.0, rate_limit: dict = None, jitter: float = 0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = {p: 0.0 for p in PROVIDERS}
+        self.rate_limit.update(rate_limit or {})
+        self.calls = {p: 0 for p in PROVIDERS}
+        self.throttled = {p: 0 for p in PROVIDERS}
+        self._lock = threading.Lock()
+        self._rng = random.Random(0)
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.port = self.httpd.server_address[1]
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def env(self) -> dict:
+        """Environment variables that route all three SDKs to this server."""
+        return {
+            "GROQ_BASE_URL": self.url,
+            "OPENAI_BASE_URL": f"{self.url}/oai/v1",
+            "GOOGLE_GEMINI_BASE_URL": self.url,
+            "GROQ_API_KEY": "bench",
+            "OPENAI_API_KEY": "bench",
+            "GEMINI_API_KEY": "bench",
+        }
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _should_throttle(self, provider: str) -> bool:
+        with self._lock:
+            self.calls[provider] += 1
+            throttle = self._rng.random() < self.rate_limit[provider]
+            if throttle:
+                self.throttled[provider] += 1
+            return throttle
+
+    def _delay(self):
+        with self._lock:
+            extra = self._rng.uniform(0, self.jitter) if self.jitter else 0.0
+        time.sleep(self.latency + extra)
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body: dict, headers: dict = None):
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                if self.path.endswith("/chat/completions"):
+                    provider = "openai" if self.path.startswith("/oai/") else "groq"
+                    prompt = body["messages"][-1]["content"]
+                elif ":generateContent" in self.path:
+                    provider = "gemini"
+                    prompt = body["contents"][-1]["parts"][0]["text"]
+                else:
+                    return self._send(404, {"error": {"message": f"unknown path {self.path}"}})
+
+                server._delay()
+                if server._should_throttle(provider):
+                    status = "RESOURCE_EXHAUSTED" if provider == "gemini" else "rate_limit_exceeded"
+                    return self._send(429, {"error": {"code": 429, "message": "Rate limit", "status": status}},
+                                      {"Retry-After": "0"})
+
+                text = _reply(prompt)
+                prompt_tokens, completion_tokens = len(prompt) // 4, len(text) // 4
+                if provider == "gemini":
+                    return self._send(200, {
+                        "candidates": [{"content": {"role": "model", "parts": [{"text": text}]}, "finishReason": "STOP"}],
+                        "usageMetadata": {"promptTokenCount": prompt_tokens, "candidatesTokenCount": completion_tokens,
+                                          "totalTokenCount": prompt_tokens + completion_tokens},
+                    })
+                return self._send(200, {
+                    "id": "chatcmpl-bench",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": body.get("model", "bench"),
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": text}}],
+                    "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                              "total_tokens": prompt_tokens + completion_tokens},
+                })
+
+        return Handler
+
+
+def parse_rate_limits(specs: list) -> dict:
+    """['groq=0.2', 'gemini=0.1'] -> {'groq': 0.2, 'gemini': 0.1}"""
+    limits = {}
+    for spec in specs or []:
+        name, _, rate = spec.partition("=")
+        if name not in PROVIDERS:
+            raise ValueError(f"Unknown provider in rate limit spec: {name}")
+        limits[name] = float(rate)
+    return limits
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake Groq/OpenAI/Gemini server for benchmarks")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra uniform random latency (seconds)")
+    parser.add_argument("--rate-limit", nargs="*", default=[], help="provider=probability of HTTP 429")
+    args = parser.parse_args()
+    server = FakeLLMServer(args.port, args.latency, parse_rate_limits(args.rate_limit), args.jitter)
+    for k, v in server.env().items():
+        print(f"export {k}={v}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
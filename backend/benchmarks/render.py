@@ -0,0 +1,81 @@
+"""
+PDF render backend comparison: pdflatex vs the in-process native renderer.
+
+For every template and corpus size, reports per-render latency (p50/p95) and
+memory. Native memory is the tracemalloc peak of one render; LaTeX memory is
+the peak RSS of the pdflatex child processes (the API process itself barely
+allocates on that path).
+
+Usage (from backend/):
+    python benchmarks/render.py --iterations 20
+"""
+import os
+import sys
+import time
+import shutil
+import logging
+import argparse
+import resource
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench import percentile
+from corpus import SIZES, make_resume
+
+TEMPLATES = ("classic", "modern", "minimal")
+
+
+def measure_renderer(generator, renderer: str, data: dict, template: str, iterations: int) -> dict:
+    generator.generate_resume(data, "pdf", template, renderer)  # warm-up: imports, font metrics
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        path = generator.generate_resume(data, "pdf", template, renderer)
+        samples.append(time.perf_counter() - start)
+    if renderer == "native":
+        # Separate traced run: tracemalloc slows allocation-heavy code and would skew latency
+        tracemalloc.start()
+        generator.generate_resume(data, "pdf", template, renderer)
+        peak_kb = tracemalloc.get_traced_memory()[1] / 1024
+        tracemalloc.stop()
+    else:
+        peak_kb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss  # KiB on Linux
+    return {
+        "p50_ms": round(percentile(samples, 50) * 1000, 2),
+        "p95_ms": round(percentile(samples, 95) * 1000, 2),
+        "peak_kb": round(peak_kb, 1),
+        "bytes": os.path.getsize(path),
+    }
+
+
+def run(args):
+    from pdf_generator import PDFGenerator
+    logging.getLogger().setLevel(logging.WARNING)
+    generator = PDFGenerator()
+    generator.OUTPUT_DIR = tempfile.mkdtemp(prefix="resume-render-")
+    renderers = ["native"] + (["latex"] if generator._find_pdflatex() else [])
+
+    print(f"  {'renderer':<8} {'template':<8} {'size':<7} {'p50':>10} {'p95':>10} {'peak mem':>12} {'pdf size':>10}")
+    for size in SIZES:
+        data = make_resume(size)
+        for template in TEMPLATES:
+            for renderer in renderers:
+                r = measure_renderer(generator, renderer, data, template, args.iterations)
+                print(f"  {renderer:<8} {template:<8} {size:<7} {r['p50_ms']:>8.2f}ms {r['p95_ms']:>8.2f}ms "
+                      f"{r['peak_kb']:>9.1f}KiB {r['bytes']:>9}B")
+    if "latex" not in renderers:
+        print("  pdflatex not found: LaTeX backend skipped")
+    if args.keep:
+        print(f"  PDFs kept in {generator.OUTPUT_DIR}")
+    else:
+        shutil.rmtree(generator.OUTPUT_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare pdflatex and native PDF rendering")
+    parser.add_argument("--iterations", type=int, default=10, help="Renders per template/size/backend")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated PDFs")
+    run(parser.parse_args())
@@ -0,0 +1,82 @@
+"""
+Cold-start profile for the API entry point.
+
+Imports `main` in a fresh interpreter with `-X importtime`, prints the slowest
+top-level imports, and fails if the import exceeds the time budget or eagerly
+loads a module that should only be imported on first use.
+
+Usage (from backend/):
+    python benchmarks/startup.py
+    python benchmarks/startup.py --budget-ms 800 --top 20
+"""
+import os
+import re
+import sys
+import json
+import argparse
+import subprocess
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# Must not be imported just to serve a health check
+LAZY_MODULES = ["openai", "groq", "google.genai", "pypdf", "docx", "jinja2", "uvicorn", "numpy", "fpdf"]
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)")
+
+PROBE = (
+    "import sys, json, time\n"
+    "start = time.perf_counter()\n"
+    "import main\n"
+    "elapsed = time.perf_counter() - start\n"
+    "print(json.dumps({'elapsed_ms': elapsed * 1000, 'modules': sorted(sys.modules)}))\n"
+)
+
+
+def profile(env: dict) -> tuple:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    imports = []
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            self_us, cumulative_us, indent, name = m.groups()
+            depth = (len(indent) - 1) // 2
+            imports.append((name, depth, int(self_us), int(cumulative_us)))
+    report = json.loads(proc.stdout.strip().splitlines()[-1])
+    return imports, report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import-time profile and startup budget check for main.py")
+    parser.add_argument("--budget-ms", type=float, default=1000.0, help="Max wall time to import main")
+    parser.add_argument("--top", type=int, default=15, help="Slowest top-level imports to show")
+    parser.add_argument("--runs", type=int, default=3, help="Take the fastest of N cold imports")
+    args = parser.parse_args()
+
+    # Pretend to be serverless so the run matches a Vercel cold start and writes to /tmp only
+    env = dict(os.environ, VERCEL="1")
+    runs = [profile(env) for _ in range(args.runs)]
+    imports, report = min(runs, key=lambda r: r[1]["elapsed_ms"])
+
+    print(f"{'module':<40} {'cumulative ms':>14} {'self ms':>10}")
+    top_level = [i for i in imports if i[1] == 1]
+    for name, _, self_us, cum_us in sorted(top_level, key=lambda i: -i[3])[:args.top]:
+        print(f"{name:<40} {cum_us / 1000:>14.1f} {self_us / 1000:>10.1f}")
+    print(f"\nimport main: {report['elapsed_ms']:.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+    failures = []
+    if report["elapsed_ms"] > args.budget_ms:
+        failures.append(f"import main took {report['elapsed_ms']:.1f} ms, over the {args.budget_ms:.0f} ms budget")
+    loaded = set(report["modules"])
+    for mod in LAZY_MODULES:
+        if mod in loaded:
+            failures.append(f"{mod} is imported at startup; it should load on first use")
+
+    if failures:
+        print("\n❌ Startup check failed:")
+        for f in failures:
+            print(f"   {f}")
+        sys.exit(1)
+    print("✅ Startup within budget, no eager heavy imports")
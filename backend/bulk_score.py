@@ -0,0 +1,299 @@
+"""
+Offline bulk scoring for a directory of resumes (PDF/DOCX).
+
+Parsing and mechanical checks run in a process pool sized to the CPU count;
+AI scoring runs in a small thread pool (--llm-concurrency) so provider rate
+limits are respected. Files with identical content are scored once. Results
+stream to a JSONL file (and optionally CSV) one row per resume; the JSONL is
+also the checkpoint, so re-running the same command skips files already done.
+Rows whose AI evaluation failed (rate limit, deadline) are written with status
+"fallback" (heuristic score) and retried on the next run.
+
+Usage (from backend/):
+    python bulk_score.py ./resumes --jd-file jd.txt --out results.jsonl --csv results.csv
+    python bulk_score.py ./resumes --no-ai --workers 8       # local checks + heuristics only
+"""
+import os
+import csv
+import sys
+import json
+import time
+import hashlib
+import logging
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+logger = logging.getLogger(__name__)
+
+BULK_LLM_CONCURRENCY = int(os.getenv("BULK_LLM_CONCURRENCY", "4"))
+EXTENSIONS = (".pdf", ".docx")
+CSV_FIELDS = ["file", "status", "score", "mechanical_score", "ai_evaluated", "pages", "columns",
+              "critical_missing", "cached", "error"]
+
+
+def discover(directory: str) -> list:
+    """Resume files under directory, sorted for a stable processing order."""
+    found = []
+    for root, _, names in os.walk(directory):
+        found.extend(os.path.join(root, n) for n in names if n.lower().endswith(EXTENSIONS) and not n.startswith("~$"))
+    return sorted(found)
+
+
+def fingerprint(path: str) -> str:
+    """Checkpoint key: a file is redone if it was replaced or modified since its row was written."""
+    st = os.stat(path)
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+
+def parse_file(path: str, layout: bool) -> dict:
+    """Parse + mechanical checks. Runs in a worker process."""
+    from resume_parser import ResumeParser
+    from ats_analyzer import ATSAnalyzer
+    start = time.perf_counter()
+    with open(path, "rb") as f:
+        sha1 = hashlib.sha1(f.read()).hexdigest()
+    data = ResumeParser.extract_data(path, layout)
+    metadata = {"file_size": os.path.getsize(path)}
+    if "layout" in data:
+        metadata["layout"] = data["layout"]
+    mechanical = ATSAnalyzer().analyze_mechanical_compliance(data["text"], metadata)
+    return {"sha1": sha1, "text": data["text"], "mechanical": mechanical, "parse_ms": round((time.perf_counter() - start) * 1000, 1)}
+
+
+def ai_evaluated(report: dict) -> bool:
+    """False for heuristic fallbacks and unreadable input."""
+    return report["compliance"]["parsing_valid"] and "heuristic_keywords" not in report["section_scores"]
+
+
+def _init_worker():
+    logging.getLogger().setLevel(logging.WARNING)
+
+
+def run_key(job_description: str, use_ai: bool, layout: bool) -> str:
+    """Rows are only reused by a run with the same JD and scoring options."""
+    return hashlib.sha1(f"{job_description.strip()}|{use_ai}|{layout}".encode("utf-8")).hexdigest()[:12]
+
+
+def load_checkpoint(out_path: str, key: str, retry_errors: bool, use_ai: bool = True) -> tuple:
+    """
+    ({file: fingerprint} already written, {sha1: report} reusable for duplicates) for run `key`.
+    "fallback" rows are never done: a transient AI failure must not stick to the file.
+    """
+    done, reports = {}, {}
+    if not os.path.exists(out_path):
+        return done, reports
+    with open(out_path, "rb+") as f:
+        content = f.read()
+        # A crash mid-write leaves a partial last line; cut it so appends start clean
+        if content and not content.endswith(b"\n"):
+            f.truncate(content.rfind(b"\n") + 1)
+    for line in content.decode("utf-8", "replace").splitlines():
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if row.get("run") != key:
+            continue
+        status = row.get("status")
+        if status == "ok" and use_ai and not row.get("ai_evaluated") and row["report"]["compliance"]["parsing_valid"]:
+            status = "fallback"  # written before fallbacks had their own status
+        if status == "fallback":
+            done.pop(row["file"], None)
+        elif status == "ok":
+            done[row["file"]] = row["key"]
+            reports[row["sha1"]] = row["report"]
+        elif not retry_errors:
+            done[row["file"]] = row["key"]
+    return done, reports
+
+
+class ResultWriter:
+    """Appends one JSONL (and CSV) row per resume, flushed immediately."""
+
+    def __init__(self, out_path: str, csv_path: str = None):
+        os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+        self.jsonl = open(out_path, "a", encoding="utf-8")
+        self.csv_file = self.csv = None
+        if csv_path:
+            new = not os.path.exists(csv_path) or os.path.getsize(csv_path) == 0
+            self.csv_file = open(csv_path, "a", encoding="utf-8", newline="")
+            self.csv = csv.DictWriter(self.csv_file, fieldnames=CSV_FIELDS)
+            if new:
+                self.csv.writeheader()
+
+    def write(self, row: dict):
+        self.jsonl.write(json.dumps(row) + "\n")
+        self.jsonl.flush()
+        if self.csv:
+            report = row.get("report") or {}
+            layout = report.get("compliance", {}).get("complex_layout", {})
+            self.csv.writerow({
+                "file": row["file"],
+                "status": row["status"],
+                "score": report.get("score", ""),
+                "mechanical_score": report.get("section_scores", {}).get("mechanical_compliance", ""),
+                "ai_evaluated": row.get("ai_evaluated", ""),
+                "pages": report.get("compliance", {}).get("page_check", {}).get("estimated_pages", ""),
+                "columns": layout.get("columns", ""),
+                "critical_missing": "; ".join(report.get("keywords", {}).get("critical_missing", [])),
+                "cached": row.get("cached", False),
+                "error": row.get("error", ""),
+            })
+            self.csv_file.flush()
+
+    def close(self):
+        self.jsonl.close()
+        if self.csv_file:
+            self.csv_file.close()
+
+
+class Progress:
+    def __init__(self, total: int, interval: float):
+        self.total = total
+        self.interval = interval
+        self.start = self.last = time.perf_counter()
+        self.parsed = self.done = self.errors = self.cached = self.fallbacks = 0
+
+    def report(self, force: bool = False):
+        now = time.perf_counter()
+        if not force and now - self.last < self.interval:
+            return
+        self.last = now
+        elapsed = max(now - self.start, 1e-9)
+        rate = self.done / elapsed
+        eta = (self.total - self.done) / rate if rate else 0.0
+        logger.info(f"📊 {self.done}/{self.total} done | parsed {self.parsed / elapsed:.1f}/s | "
+                    f"scored {rate:.1f}/s | {self.cached} cached | {self.fallbacks} AI fallbacks | {self.errors} errors | ETA {eta:.0f}s")
+
+
+def run(args) -> int:
+    from ats_scorer import ATSScorer
+    from deadline import Deadline, SCORE_DEADLINE
+
+    job_description = args.jd or ""
+    if args.jd_file:
+        with open(args.jd_file, encoding="utf-8") as f:
+            job_description = f.read()
+
+    key = run_key(job_description, not args.no_ai, args.layout)
+    files = discover(args.directory)
+    done, reports = load_checkpoint(args.out, key, args.retry_errors, not args.no_ai)
+    rel = {path: os.path.relpath(path, args.directory) for path in files}
+    todo = [p for p in files if done.get(rel[p]) != fingerprint(p)]
+    logger.info(f"📂 {len(files)} resumes in {args.directory} | {len(files) - len(todo)} already in {args.out} | "
+                f"{len(todo)} to process ({args.workers} parse workers, "
+                f"{'no AI' if args.no_ai else f'{args.llm_concurrency} concurrent AI calls'})")
+    if not todo:
+        return 0
+
+    def score(text: str, mechanical: dict) -> tuple:
+        start = time.perf_counter()
+        report = ATSScorer.score_checked(text, job_description, mechanical, Deadline(SCORE_DEADLINE), use_ai=not args.no_ai)
+        return report, round((time.perf_counter() - start) * 1000, 1)
+
+    writer = ResultWriter(args.out, args.csv)
+    progress = Progress(len(todo), args.report_every)
+    window = max(args.workers, args.llm_concurrency) * 4  # files parsed or parsing but not yet written
+    queue = list(reversed(todo))
+    parse_futures, score_futures = {}, {}   # future -> path / future -> [(path, parsed)]
+    in_flight_sha = {}                      # sha1 -> scoring future, so duplicates share one evaluation
+
+    def emit(path: str, **row):
+        writer.write({"file": rel[path], "key": fingerprint(path), "run": key, **row})
+        progress.done += 1
+        progress.errors += row["status"] == "error"
+        progress.fallbacks += row["status"] == "fallback"
+        progress.cached += bool(row.get("cached"))
+        progress.report()
+
+    ctx = multiprocessing.get_context("spawn")
+    try:
+        with ProcessPoolExecutor(args.workers, mp_context=ctx, initializer=_init_worker) as parse_pool, \
+                ThreadPoolExecutor(max(1, args.llm_concurrency)) as score_pool:
+            while queue or parse_futures or score_futures:
+                pending = len(parse_futures) + sum(len(w) for w in score_futures.values())
+                while queue and pending < window:
+                    path = queue.pop()
+                    parse_futures[parse_pool.submit(parse_file, path, args.layout)] = path
+                    pending += 1
+
+                finished, _ = wait(list(parse_futures) + list(score_futures), return_when=FIRST_COMPLETED)
+                for future in finished:
+                    if future in parse_futures:
+                        path = parse_futures.pop(future)
+                        progress.parsed += 1
+                        try:
+                            parsed = future.result()
+                        except Exception as e:
+                            logger.error(f"❌ {rel[path]}: {str(e)}")
+                            emit(path, status="error", error=str(e))
+                            continue
+                        sha1 = parsed["sha1"]
+                        if sha1 in reports:
+                            report = reports[sha1]
+                            emit(path, status="ok", sha1=sha1, cached=True, parse_ms=parsed["parse_ms"], score_ms=0.0,
+                                 ai_evaluated=ai_evaluated(report), report=report)
+                        elif sha1 in in_flight_sha:
+                            score_futures[in_flight_sha[sha1]].append((path, parsed))
+                        else:
+                            scoring = score_pool.submit(score, parsed["text"], parsed["mechanical"])
+                            in_flight_sha[sha1] = scoring
+                            score_futures[scoring] = [(path, parsed)]
+                    else:
+                        waiters = score_futures.pop(future)
+                        sha1 = waiters[0][1]["sha1"]
+                        in_flight_sha.pop(sha1, None)
+                        try:
+                            report, score_ms = future.result()
+                        except Exception as e:
+                            for path, _ in waiters:
+                                logger.error(f"❌ {rel[path]}: {str(e)}")
+                                emit(path, status="error", sha1=sha1, error=str(e))
+                            continue
+                        # A heuristic fallback in AI mode is transient: keep the row but don't reuse it
+                        fallback = not args.no_ai and report["compliance"]["parsing_valid"] and not ai_evaluated(report)
+                        if not fallback:
+                            reports[sha1] = report
+                        for i, (path, parsed) in enumerate(waiters):
+                            emit(path, status="fallback" if fallback else "ok", sha1=sha1, cached=i > 0, parse_ms=parsed["parse_ms"],
+                                 score_ms=score_ms, ai_evaluated=ai_evaluated(report), report=report)
+    except KeyboardInterrupt:
+        logger.warning(f"⚠️  Interrupted: {progress.done} rows written to {args.out}; re-run to resume")
+        return 130
+    finally:
+        writer.close()
+    progress.report(force=True)
+    logger.info(f"✅ Finished in {time.perf_counter() - progress.start:.1f}s -> {args.out}" + (f", {args.csv}" if args.csv else ""))
+    if progress.fallbacks:
+        logger.warning(f"⚠️  {progress.fallbacks} resumes fell back to heuristic scores; re-run to retry their AI evaluation")
+    return 1 if progress.errors or progress.fallbacks else 0
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    load_dotenv(override=True)
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s | %(levelname)-7s | %(name)-20s | %(message)s",
+        datefmt="%H:%M:%S"
+    )
+    parser = argparse.ArgumentParser(description="Score a directory of resumes offline")
+    parser.add_argument("directory", help="Folder with PDF/DOCX resumes (searched recursively)")
+    parser.add_argument("--jd", default="", help="Job description text")
+    parser.add_argument("--jd-file", help="File with the job description")
+    parser.add_argument("--out", default="bulk_results.jsonl", help="JSONL results; also the resume-on-restart checkpoint")
+    parser.add_argument("--csv", help="Also write a flat CSV summary")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Parse/check processes")
+    parser.add_argument("--llm-concurrency", type=int, default=BULK_LLM_CONCURRENCY, help="Concurrent AI evaluations")
+    parser.add_argument("--no-ai", action="store_true", help="Mechanical checks + heuristic score only")
+    parser.add_argument("--layout", action="store_true", help="Layout-aware PDF parsing (columns, tables, fonts)")
+    parser.add_argument("--retry-errors", action="store_true", help="Redo files whose previous row is an error")
+    parser.add_argument("--report-every", type=float, default=5.0, help="Seconds between throughput reports")
+    parser.add_argument("--verbose", action="store_true", help="Keep per-call provider logs")
+    args = parser.parse_args()
+    if not args.verbose:
+        # Per-call provider logs would drown the progress lines
+        for name in ("ai_enhancer", "httpx"):
+            logging.getLogger(name).setLevel(logging.WARNING)
+    sys.exit(run(args))
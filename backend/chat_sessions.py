@@ -0,0 +1,111 @@
+"""
+Server-side chat sessions for /chat.
+
+The resume context is sent once when a session starts; later messages only
+carry the session_id. Each session keeps recent turns verbatim and folds older
+turns into a running summary once the history exceeds its character budget.
+"""
+import os
+import time
+import uuid
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+CHAT_SESSION_TTL = float(os.getenv("CHAT_SESSION_TTL_SECONDS", "3600"))
+CHAT_MAX_SESSIONS = int(os.getenv("CHAT_MAX_SESSIONS", "1000"))
+CHAT_HISTORY_CHAR_BUDGET = int(os.getenv("CHAT_HISTORY_CHAR_BUDGET", "6000"))
+CHAT_KEEP_RECENT_TURNS = int(os.getenv("CHAT_KEEP_RECENT_TURNS", "4"))
+
+
+class ChatSession:
+    def __init__(self, context: str):
+        self.session_id = uuid.uuid4().hex
+        self.context = context
+        self.summary = ""
+        self.turns = []  # [{"role": "user"|"assistant", "content": str}]
+        self.updated_at = time.time()
+        self.lock = threading.Lock()
+        self.compacting = False
+
+    def history_chars(self) -> int:
+        return len(self.summary) + sum(len(t["content"]) for t in self.turns)
+
+    def needs_compaction(self) -> bool:
+        return self.history_chars() > CHAT_HISTORY_CHAR_BUDGET and len(self.turns) > CHAT_KEEP_RECENT_TURNS
+
+    def add_exchange(self, message: str, reply: str):
+        with self.lock:
+            self.turns.append({"role": "user", "content": message})
+            self.turns.append({"role": "assistant", "content": reply})
+            self.updated_at = time.time()
+
+    def snapshot(self):
+        """(summary, turns) as of now, safe to use outside the lock."""
+        with self.lock:
+            return self.summary, list(self.turns)
+
+    def compact(self, summarize):
+        """
+        Fold all but the most recent turns into the summary. `summarize(summary, turns)`
+        returns the new summary or an "Error:" string; on failure the older turns are
+        simply dropped so the history stays bounded.
+        """
+        with self.lock:
+            if self.compacting or not self.needs_compaction():
+                return
+            self.compacting = True
+            summary = self.summary
+            older = self.turns[:len(self.turns) - CHAT_KEEP_RECENT_TURNS]
+        try:
+            new_summary = summarize(summary, older)
+        except Exception as e:
+            logger.error(f"❌ Chat summary failed: {str(e)}")
+            new_summary = "Error: " + str(e)
+        with self.lock:
+            # Turns appended while summarizing sit after `older` and are kept
+            self.turns = self.turns[len(older):]
+            if not new_summary.startswith("Error:"):
+                self.summary = new_summary.strip()
+            else:
+                logger.warning(f"⚠️  Chat summary unavailable, dropped {len(older)} old turns")
+            self.compacting = False
+        logger.info(f"🗜️  Compacted chat {self.session_id}: {len(older)} turns folded, {self.history_chars()} chars kept")
+
+
+class ChatSessionStore:
+    """Bounded in-process LRU of chat sessions with idle expiry."""
+
+    def __init__(self, max_sessions: int = CHAT_MAX_SESSIONS, ttl: float = CHAT_SESSION_TTL):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, context: str) -> ChatSession:
+        session = ChatSession(context)
+        with self._lock:
+            self._sessions[session.session_id] = session
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return session
+
+    def get(self, session_id: str):
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            if time.time() - session.updated_at > self.ttl:
+                del self._sessions[session_id]
+                return None
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+
+store = ChatSessionStore()
@@ -0,0 +1,27 @@
+import os
+import time
+
+# Default request budgets (seconds). Override via .env.
+SCORE_DEADLINE = float(os.getenv("SCORE_DEADLINE_SECONDS", "45"))
+ENHANCE_DEADLINE = float(os.getenv("ENHANCE_DEADLINE_SECONDS", "30"))
+PROVIDER_TIMEOUT = float(os.getenv("PROVIDER_TIMEOUT_SECONDS", "20"))
+
+class Deadline:
+    """Request-scoped time budget passed from the endpoint down to each SDK call."""
+
+    # Below this many seconds left, starting another provider call is pointless
+    MIN_CALL_BUDGET = 1.0
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() < self.MIN_CALL_BUDGET
+
+    def timeout(self, cap: float = PROVIDER_TIMEOUT) -> float:
+        """Timeout for the next upstream call: the remaining budget, capped per call."""
+        return min(cap, self.remaining())
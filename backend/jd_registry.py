@@ -0,0 +1,148 @@
+"""
+Job description registry.
+
+A JD is normalized, hashed and preprocessed once (boilerplate stripped,
+keywords/phrases extracted and split into critical vs recommended). Clients
+can register a JD via POST /jd and then send only its `jd_id`; scoring and
+enhancement paths look JDs up here so repeated JDs reuse the work.
+"""
+import os
+import re
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field, asdict
+from typing import List
+import metrics
+
+JD_REGISTRY_SIZE = int(os.getenv("JD_REGISTRY_SIZE", "1024"))
+
+_HEADER_RE = re.compile(r"^\s*(#+\s*|\*\*)?([A-Za-z][A-Za-z /&'()-]{1,50}?)(?:\*\*)?\s*(:?)\s*$")
+_INLINE_HEADER_RE = re.compile(r"^\s*([A-Za-z][A-Za-z /&'-]{1,30}):\s+(\S.*)$")
+_PHRASE_RE = re.compile(r"\b[A-Z][\w+#./-]*(?:[ \t]+[A-Z][\w+#./-]*){1,3}\b")
+_BOILERPLATE_LINE_RE = re.compile(
+    r"equal opportunity employer|regardless of (?:race|gender|age|religion)|reasonable accommodation|e-verify",
+    re.IGNORECASE
+)
+
+# A bare line is a header only when it is exactly one of these phrases; a line ending in ":"
+# (or marked up as "## ..." / "**...**") is a header when it starts with one.
+BOILERPLATE_HEADERS = ("about us", "about the company", "who we are", "benefits", "perks", "equal opportunity",
+                       "eeo", "how to apply", "our values", "what we offer", "compensation", "benefits & perks",
+                       "perks & benefits", "perks and benefits", "benefits and perks", "compensation & benefits")
+CRITICAL_HEADERS = ("requirements", "required", "qualifications", "must have", "must haves", "what you need",
+                    "minimum qualifications", "basic qualifications", "required qualifications", "required skills",
+                    "you have", "responsibilities", "key responsibilities", "skills", "key skills", "technical skills",
+                    "key qualifications", "what you'll need", "what we're looking for", "job requirements")
+RECOMMENDED_HEADERS = ("nice to have", "nice to haves", "preferred", "bonus", "bonus points", "plus", "pluses",
+                       "preferred qualifications", "preferred skills", "good to have")
+
+
+@dataclass(frozen=True)
+class JobDescription:
+    jd_id: str
+    text: str                    # normalized original
+    clean_text: str              # boilerplate stripped; what prompts use
+    keywords: List[str] = field(default_factory=list)
+    critical: List[str] = field(default_factory=list)
+    recommended: List[str] = field(default_factory=list)
+    phrases: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["original_length"] = len(self.text)
+        data["clean_length"] = len(self.clean_text)
+        return data
+
+
+def normalize(text: str) -> str:
+    lines = [re.sub(r"[ \t]+", " ", line).strip() for line in (text or "").replace("\r\n", "\n").split("\n")]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+
+def jd_hash(text: str) -> str:
+    return hashlib.sha256(normalize(text).encode("utf-8")).hexdigest()[:16]
+
+
+def _classify_header(title: str, marked: bool = False):
+    """Section kind for a header title. Unmarked titles must match exactly so sentences like
+    "Benefits include stock options" or "Plus experience with Kubernetes" stay content."""
+    title = title.lower().strip().rstrip(":").strip()
+    for kind, headers in (("boilerplate", BOILERPLATE_HEADERS), ("recommended", RECOMMENDED_HEADERS), ("critical", CRITICAL_HEADERS)):
+        if title in headers or (marked and any(title.startswith(h) for h in headers)):
+            return kind
+    return None
+
+
+def preprocess(text: str) -> JobDescription:
+    from ats_scorer import ATSScorer # Local import to avoid circular dependency
+
+    normalized = normalize(text)
+    section = "critical"
+    kept, critical_lines, recommended_lines = [], [], []
+    for line in normalized.split("\n"):
+        header = _HEADER_RE.match(line)
+        kind = None
+        if header and len(line) <= 60:
+            kind = _classify_header(header.group(2), marked=bool(header.group(1) or header.group(3)))
+        if kind:
+            section = kind
+            if kind != "boilerplate":
+                kept.append(line)
+            continue
+        line_kind, content = section, line
+        inline = _INLINE_HEADER_RE.match(line)
+        if inline and _classify_header(inline.group(1), marked=True):
+            # "Must have: Docker, Kubernetes" - classify by the inline label, drop it from keywords
+            line_kind, content = _classify_header(inline.group(1), marked=True), inline.group(2)
+        if line_kind == "boilerplate" or _BOILERPLATE_LINE_RE.search(line):
+            continue
+        kept.append(line)
+        (recommended_lines if line_kind == "recommended" else critical_lines).append(content)
+
+    clean_text = "\n".join(kept).strip()
+    critical = ATSScorer._extract_keywords("\n".join(critical_lines))
+    recommended = [k for k in ATSScorer._extract_keywords("\n".join(recommended_lines)) if k not in critical]
+    phrases = sorted(set(_PHRASE_RE.findall(clean_text)))
+    return JobDescription(
+        jd_id=jd_hash(normalized),
+        text=normalized,
+        clean_text=clean_text,
+        keywords=sorted(set(critical) | set(recommended)),
+        critical=sorted(critical),
+        recommended=sorted(recommended),
+        phrases=phrases,
+    )
+
+
+class JDRegistry:
+    """Bounded in-process LRU of preprocessed job descriptions, keyed by content hash."""
+
+    def __init__(self, max_size: int = JD_REGISTRY_SIZE):
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, jd_id: str):
+        with self._lock:
+            jd = self._items.get(jd_id)
+            if jd is not None:
+                self._items.move_to_end(jd_id)
+        metrics.record_cache("jd_registry", jd is not None)
+        return jd
+
+    def register(self, text: str) -> JobDescription:
+        jd_id = jd_hash(text)
+        jd = self.get(jd_id)
+        if jd is not None:
+            return jd
+        with metrics.timed("jd_preprocess"):
+            jd = preprocess(text)
+        with self._lock:
+            self._items[jd_id] = jd
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+        return jd
+
+
+registry = JDRegistry()
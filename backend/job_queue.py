@@ -0,0 +1,250 @@
+"""
+Local background job queue for heavy endpoints (/generate, /score).
+
+Jobs are stored in SQLite so no external broker is needed; a pool of worker
+processes claims them by priority lane. Render and scoring workers are sized
+separately so CPU-bound pdflatex runs don't starve LLM-bound scoring.
+
+Enable with JOB_MODE=1. Workers start with the API, or standalone:
+    python job_queue.py --kinds generate --workers 4
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import sqlite3
+import logging
+import argparse
+import multiprocessing
+import socket
+from contextlib import closing
+from runtime import data_path
+
+logger = logging.getLogger(__name__)
+
+JOB_MODE = os.getenv("JOB_MODE", "").lower() in ("1", "true", "yes")
+JOB_DB_PATH = os.getenv("JOB_DB_PATH", data_path(os.path.join(os.path.dirname(__file__), "jobs.db"), "/tmp/resume_jobs.db"))
+RENDER_WORKERS = int(os.getenv("JOB_RENDER_WORKERS", "2"))
+SCORE_WORKERS = int(os.getenv("JOB_SCORE_WORKERS", "2"))
+POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "0.2"))
+# Running jobs whose owner can't be checked (other host, pre-owner rows) are requeued after this
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "600"))
+# How often each worker looks for jobs abandoned by crashed workers (besides at startup)
+JOB_REQUEUE_INTERVAL = float(os.getenv("JOB_REQUEUE_INTERVAL", "60"))
+
+PRIORITIES = {"high": 2, "normal": 1, "low": 0}
+JOB_KINDS = ("generate", "score")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    worker TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs (status, kind, priority DESC, created_at);
+"""
+
+
+class JobQueue:
+    def __init__(self, db_path: str = JOB_DB_PATH):
+        self.db_path = db_path
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "worker" not in columns:  # databases created before jobs recorded their owner
+                conn.execute("ALTER TABLE jobs ADD COLUMN worker TEXT")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def enqueue(self, kind: str, payload: dict, priority: str = "normal") -> str:
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority}. Use one of {list(PRIORITIES)}")
+        job_id = uuid.uuid4().hex
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, priority, status, payload, created_at) VALUES (?, ?, ?, 'queued', ?, ?)",
+                (job_id, kind, PRIORITIES[priority], json.dumps(payload), time.time())
+            )
+        return job_id
+
+    def claim(self, kinds: tuple = JOB_KINDS):
+        """Atomically take the highest-priority, oldest queued job of the given kinds."""
+        placeholders = ",".join("?" * len(kinds))
+        # Closing without COMMIT rolls the transaction back
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                f"SELECT * FROM jobs WHERE status = 'queued' AND kind IN ({placeholders}) "
+                "ORDER BY priority DESC, created_at LIMIT 1",
+                kinds
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute("UPDATE jobs SET status = 'running', started_at = ?, worker = ? WHERE id = ?",
+                         (time.time(), _worker_id(), row["id"]))
+            conn.execute("COMMIT")
+            return dict(row)
+
+    def finish(self, job_id: str, result: dict = None, error: str = None):
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                ("failed" if error else "done", json.dumps(result) if result is not None else None, error, time.time(), job_id)
+            )
+
+    def get(self, job_id: str):
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        job.pop("payload")
+        job["priority"] = next(name for name, value in PRIORITIES.items() if value == job["priority"])
+        return job
+
+    def requeue_stale(self, kinds: tuple = JOB_KINDS) -> int:
+        """
+        Put jobs left 'running' by a dead worker back on the queue. Jobs whose worker
+        process is still alive (e.g. owned by another uvicorn worker) are left alone.
+        """
+        placeholders = ",".join("?" * len(kinds))
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                f"SELECT id, worker, started_at FROM jobs WHERE status = 'running' AND kind IN ({placeholders})", kinds
+            ).fetchall()
+            stale = []
+            for row in rows:
+                alive = _worker_alive(row["worker"])
+                if alive is False or (alive is None and (row["started_at"] or 0) < now - JOB_LEASE_SECONDS):
+                    stale.append(row["id"])
+            for job_id in stale:
+                conn.execute("UPDATE jobs SET status = 'queued', started_at = NULL, worker = NULL WHERE id = ?", (job_id,))
+            conn.execute("COMMIT")
+        if stale:
+            logger.info(f"♻️  Requeued {len(stale)} jobs from dead workers")
+        return len(stale)
+
+
+def _worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _worker_alive(worker: str):
+    """True/False for a worker on this host; None when it can't be checked (other host or unknown)."""
+    if not worker:
+        return None
+    host, _, pid = worker.rpartition(":")
+    if host != socket.gethostname() or not pid.isdigit():
+        return None
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # exists, owned by another user
+    return True
+
+
+def _run_job(job: dict) -> dict:
+    payload = json.loads(job["payload"])
+    if job["kind"] == "generate":
+        from pdf_generator import PDFGenerator, export_result, file_url
+        if payload.get("outputs"):
+            return export_result(PDFGenerator().generate_many(payload["data"], payload["outputs"], payload.get("bundle")))
+        file_path = PDFGenerator().generate_resume(payload["data"], payload["format"], payload["template"], payload.get("renderer"))
+        return {"message": "Resume generated successfully", "filename": os.path.basename(file_path), "url": file_url(file_path)}
+    if job["kind"] == "score":
+        from ats_scorer import ATSScorer
+        from deadline import Deadline, SCORE_DEADLINE
+        return ATSScorer.calculate_score(payload["resume_text"], payload["job_description"], payload["metadata"], Deadline(SCORE_DEADLINE))
+    raise ValueError(f"Unknown job kind: {job['kind']}")
+
+
+def worker_loop(db_path: str, kinds: tuple):
+    """Claim and execute jobs forever. Runs inside a worker process."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s | %(levelname)-7s | %(name)-20s | %(message)s",
+        datefmt="%H:%M:%S"
+    )
+    queue = JobQueue(db_path)
+    logger.info(f"👷 Worker {os.getpid()} started for {', '.join(kinds)}")
+    next_requeue = time.monotonic() + JOB_REQUEUE_INTERVAL
+    while True:
+        if time.monotonic() >= next_requeue:
+            # A worker that crashed mid-job leaves it 'running'; pick it up without waiting for a restart
+            queue.requeue_stale(kinds)
+            next_requeue = time.monotonic() + JOB_REQUEUE_INTERVAL
+        job = queue.claim(kinds)
+        if job is None:
+            time.sleep(POLL_INTERVAL)
+            continue
+        logger.info(f"👷 Worker {os.getpid()} running {job['kind']} job {job['id']}")
+        try:
+            queue.finish(job["id"], result=_run_job(job))
+        except Exception as e:
+            logger.error(f"❌ Job {job['id']} failed: {str(e)}")
+            queue.finish(job["id"], error=str(e))
+
+
+def start_workers(db_path: str = JOB_DB_PATH, render_workers: int = RENDER_WORKERS, score_workers: int = SCORE_WORKERS) -> list:
+    """Spawn the render and scoring worker pools. Returns the processes."""
+    JobQueue(db_path).requeue_stale()
+    ctx = multiprocessing.get_context("spawn")
+    processes = []
+    for kinds, count in ((("generate",), render_workers), (("score",), score_workers)):
+        for _ in range(count):
+            p = ctx.Process(target=worker_loop, args=(db_path, kinds), daemon=True)
+            p.start()
+            processes.append(p)
+    logger.info(f"👷 Started {render_workers} render + {score_workers} score workers ({db_path})")
+    return processes
+
+
+def stop_workers(processes: list):
+    for p in processes:
+        p.terminate()
+    for p in processes:
+        p.join(timeout=5)
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    load_dotenv(override=True)
+    parser = argparse.ArgumentParser(description="Run background job workers")
+    parser.add_argument("--kinds", nargs="+", choices=JOB_KINDS, default=list(JOB_KINDS))
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--db", default=os.getenv("JOB_DB_PATH", JOB_DB_PATH))
+    args = parser.parse_args()
+
+    kinds = tuple(args.kinds)
+    JobQueue(args.db).requeue_stale(kinds)
+    ctx = multiprocessing.get_context("spawn")
+    procs = [ctx.Process(target=worker_loop, args=(args.db, kinds)) for _ in range(args.workers)]
+    for p in procs:
+        p.start()
+    try:
+        for p in procs:
+            p.join()
+    except KeyboardInterrupt:
+        stop_workers(procs)
+        sys.exit(0)
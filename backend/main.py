@@ -1,12 +1,14 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, Form
+from fastapi import FastAPI, UploadFile, File, HTTPException, Form, Request, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
-import uvicorn
 import os
+import time
 import shutil
 import json
 import logging
-from pydantic import BaseModel
+from contextlib import asynccontextmanager
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from typing import List, Optional
 from dotenv import load_dotenv
 
@@ -32,9 +34,25 @@ logger.info(f"🔑 GROQ_API_KEY:   {'✅ Set' if os.getenv('GROQ_API_KEY') else
 from resume_parser import ResumeParser
 from ats_scorer import ATSScorer
 from ai_enhancer import AIEnhancer
-from pdf_generator import PDFGenerator
+from pdf_generator import PDFGenerator, RENDERERS, FORMATS, export_result, file_url
+from resume_model import Resume
+from deadline import Deadline, SCORE_DEADLINE, ENHANCE_DEADLINE
+import metrics
+import job_queue
+from runtime import IS_SERVERLESS
+from jd_registry import registry as jd_registry
+from chat_sessions import store as chat_store
 
-app = FastAPI(title="AI Resume Builder & ATS Scorer")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Job mode: spawn local render/score worker pools (not available on serverless)
+    workers = []
+    if job_queue.JOB_MODE and not IS_SERVERLESS:
+        workers = job_queue.start_workers()
+    yield
+    job_queue.stop_workers(workers)
+
+app = FastAPI(title="AI Resume Builder & ATS Scorer", lifespan=lifespan)
 
 # CORS middleware
 app.add_middleware(
@@ -45,16 +63,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Ensure data directories exist (use /tmp on Vercel/serverless)
-IS_SERVERLESS = bool(os.getenv("VERCEL")) or bool(os.getenv("VERCEL_ENV")) or bool(os.getenv("AWS_LAMBDA_FUNCTION_NAME"))
-if not IS_SERVERLESS:
-    # Double-check: try to detect read-only filesystem
-    try:
-        os.makedirs("_test_write", exist_ok=True)
-        os.rmdir("_test_write")
-    except OSError:
-        IS_SERVERLESS = True
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    # Label by route template (not raw path) to keep cardinality bounded
+    route = request.scope.get("route")
+    path = getattr(route, "path", "unmatched")
+    metrics.HTTP_SECONDS.observe(time.perf_counter() - start, method=request.method, path=path, status=response.status_code)
+    return response
 
+# Ensure data directories exist (use /tmp on Vercel/serverless)
 if IS_SERVERLESS:
     UPLOAD_DIR = "/tmp/uploads"
     OUTPUT_DIR = "/tmp/output"
@@ -66,6 +85,14 @@ else:
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+# Job mode needs the long-lived worker processes started in lifespan, which serverless can't run
+job_store = None
+if job_queue.JOB_MODE and IS_SERVERLESS:
+    logger.warning("⚠️  JOB_MODE is set but not supported on serverless; ?job=true requests will be rejected")
+elif job_queue.JOB_MODE:
+    job_store = job_queue.JobQueue()
+    logger.info(f"📬 Job mode enabled ({job_queue.JOB_DB_PATH})")
+
 # Mount output directory to serve generated files
 try:
     app.mount("/output", StaticFiles(directory=OUTPUT_DIR), name="output")
@@ -86,21 +113,112 @@ class ResumeData(BaseModel):
     skills: dict = {}
     projects: List[dict] = []
 
+class TableRegion(BaseModel):
+    page: int = 1
+    top: float = 0.0
+    bottom: float = 0.0
+    rows: int = Field(0, ge=0)
+    columns: int = Field(0, ge=0)
+
+class FontUsage(BaseModel):
+    name: str
+    chars: int = 0
+
+class PageLayout(BaseModel):
+    """metadata.layout as returned by /parse with layout=true."""
+    pages: Optional[int] = Field(None, ge=1)  # unset: estimated from the word count
+    columns: int = Field(1, ge=1)
+    columns_per_page: List[int] = []
+    tables: List[TableRegion] = []
+    fonts: List[FontUsage] = []
+    font_sizes: List[int] = []
+
+class ResumeMetadata(BaseModel):
+    model_config = ConfigDict(extra="allow")
+    file_size: int = Field(0, ge=0)
+    layout: Optional[PageLayout] = None
+
+def _check_metadata(metadata: Optional[dict]) -> dict:
+    """Client-supplied metadata is validated here (422 when malformed) so ATSAnalyzer can index it directly."""
+    return ResumeMetadata.model_validate(metadata or {}).model_dump(exclude_none=True)
+
 class ScoreRequest(BaseModel):
     resume_text: str
     job_description: Optional[str] = ""
+    jd_id: Optional[str] = None
+    metadata: Optional[dict] = {}
+
+    @field_validator("metadata")
+    @classmethod
+    def validate_metadata(cls, v):
+        return _check_metadata(v)
+
+class MultiScoreRequest(BaseModel):
+    resume_text: str
+    job_descriptions: List[str] = []
+    jd_ids: List[str] = []
     metadata: Optional[dict] = {}
+    top_k: int = Field(3, ge=0)
+
+    @field_validator("metadata")
+    @classmethod
+    def validate_metadata(cls, v):
+        return _check_metadata(v)
 
 class EnhanceRequest(BaseModel):
     text: str
     provider: Optional[str] = "openai"
     type: Optional[str] = "general"
     job_description: Optional[str] = ""
+    jd_id: Optional[str] = None
+
+class EnhanceSegment(BaseModel):
+    id: Optional[str] = None
+    text: str
+    type: Optional[str] = "general"
+
+class BatchEnhanceRequest(BaseModel):
+    segments: List[EnhanceSegment]
+    provider: Optional[str] = "openai"
+    job_description: Optional[str] = ""
+    jd_id: Optional[str] = None
+
+    @field_validator("segments")
+    @classmethod
+    def unique_ids(cls, segments):
+        # Segments without an id are answered with their position as id, so those count too
+        ids = [seg.id if seg.id is not None else str(i) for i, seg in enumerate(segments)]
+        duplicates = sorted({i for i in ids if ids.count(i) > 1})
+        if duplicates:
+            raise ValueError(f"Segment ids must be unique (ids default to the segment position): {', '.join(duplicates)}")
+        return segments
+
+class JDRequest(BaseModel):
+    text: str
+
+class ExportTarget(BaseModel):
+    format: Optional[str] = "pdf"
+    template: Optional[str] = "classic"
+    renderer: Optional[str] = None
 
 class GenerateRequest(BaseModel):
     data: ResumeData
     format: Optional[str] = "pdf"
     template: Optional[str] = "classic"
+    renderer: Optional[str] = None  # "latex", "native" or "auto"; defaults to PDF_RENDERER
+    outputs: Optional[List[ExportTarget]] = None  # several formats/templates in one call
+    bundle: Optional[bool] = False  # also return all outputs as one zip
+
+MAX_EXPORT_OUTPUTS = 6
+
+def _resolve_jd(job_description: Optional[str], jd_id: Optional[str]) -> str:
+    """Return the JD text for a request that sent either the text or a registered jd_id."""
+    if not jd_id:
+        return job_description or ""
+    jd = jd_registry.get(jd_id)
+    if jd is None:
+        raise HTTPException(status_code=404, detail=f"Unknown jd_id '{jd_id}'. Register the job description again via POST /jd.")
+    return jd.text
 
 # --- Endpoints ---
 
@@ -109,89 +227,263 @@ def read_root():
     logger.info("📍 GET / - Health check")
     return {"message": "AI Resume Builder API is running"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+def _save_upload(file: UploadFile) -> tuple:
+    file_path = os.path.join(UPLOAD_DIR, os.path.basename(file.filename))
+    with open(file_path, "wb") as buffer:
+        shutil.copyfileobj(file.file, buffer)
+    
+    file_size = os.path.getsize(file_path)
+    logger.info(f"   📦 File saved: {file_path} ({file_size} bytes)")
+    return file_path, file_size
+
+def _metadata(file_size: int, data: dict) -> dict:
+    metadata = {"file_size": file_size}
+    if "layout" in data:
+        metadata["layout"] = data["layout"]
+    return metadata
+
 @app.post("/parse")
-async def parse_resume(file: UploadFile = File(...)):
+async def parse_resume(file: UploadFile = File(...), layout: Optional[bool] = Form(None)):
+    """layout=true: column-aware PDF text plus layout features (send metadata back to /score)."""
     logger.info(f"📄 POST /parse - Parsing file: {file.filename}")
     try:
-        file_path = os.path.join(UPLOAD_DIR, file.filename)
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        file_path, file_size = _save_upload(file)
         
-        file_size = os.path.getsize(file_path)
-        logger.info(f"   📦 File saved: {file_path} ({file_size} bytes)")
-        
-        data = ResumeParser.extract_data(file_path)
+        data = ResumeParser.extract_data(file_path, layout)
         logger.info(f"   ✅ Parsing complete. Text length: {len(data.get('text', ''))}")
         
         return {
             "filename": file.filename, 
             "text": data["text"],
             "parsed_data": data,
-            "metadata": {"file_size": file_size}
+            "metadata": _metadata(file_size, data)
         }
     except Exception as e:
         logger.error(f"   ❌ Parse error: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
 
+def _enqueue_job(kind: str, payload: dict, priority: str) -> JSONResponse:
+    if not job_store:
+        if job_queue.JOB_MODE:
+            raise HTTPException(status_code=503, detail="Job mode is not available on serverless deployments.")
+        raise HTTPException(status_code=400, detail="Job mode is disabled. Set JOB_MODE=1 to enable it.")
+    try:
+        job_id = job_store.enqueue(kind, payload, priority)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    logger.info(f"   📬 Queued {kind} job {job_id} (priority: {priority})")
+    return JSONResponse(status_code=202, content={"job_id": job_id, "status": "queued", "status_url": f"/jobs/{job_id}"})
+
+@app.post("/analyze")
+def analyze_resume(file: UploadFile = File(...), job_description: str = Form(""), jd_id: str = Form(""), stream: bool = Form(False),
+                   layout: Optional[bool] = Form(None)):
+    """
+    Parse + mechanical checks + AI scoring in one request. The AI evaluation starts
+    as soon as text is extracted. With stream=true, partial results are sent as
+    NDJSON lines: {"stage": "parsed"|"mechanical"|"score"|"error", ...}.
+    """
+    job_description = _resolve_jd(job_description, jd_id)
+    logger.info(f"🔬 POST /analyze - File: {file.filename} | JD length: {len(job_description)} chars | Stream: {stream}")
+    try:
+        file_path, file_size = _save_upload(file)
+        data = ResumeParser.extract_data(file_path, layout)
+    except Exception as e:
+        logger.error(f"   ❌ Analyze parse error: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    metadata = _metadata(file_size, data)
+    parsed = {"filename": file.filename, "text": data["text"], "parsed_data": data, "metadata": metadata}
+    stages = ATSScorer.iter_score(data["text"], job_description, metadata, Deadline(SCORE_DEADLINE))
+    
+    if not stream:
+        try:
+            for stage, payload in stages:
+                if stage == "score":
+                    logger.info(f"   ✅ Analysis complete. Final score: {payload.get('score', 'N/A')}")
+                    return {**parsed, "score": payload}
+        except Exception as e:
+            logger.error(f"   ❌ Analyze score error: {str(e)}")
+            raise HTTPException(status_code=500, detail=str(e))
+    
+    def events():
+        yield json.dumps({"stage": "parsed", **parsed}) + "\n"
+        try:
+            for stage, payload in stages:
+                yield json.dumps({"stage": stage, "result": payload}) + "\n"
+        except Exception as e:
+            logger.error(f"   ❌ Analyze stream error: {str(e)}")
+            yield json.dumps({"stage": "error", "detail": str(e)}) + "\n"
+    
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+@app.post("/jd")
+def register_jd(req: JDRequest):
+    logger.info(f"📋 POST /jd - JD length: {len(req.text)} chars")
+    if not req.text.strip():
+        raise HTTPException(status_code=400, detail="Job description is empty")
+    jd = jd_registry.register(req.text)
+    logger.info(f"   ✅ Registered JD {jd.jd_id} ({len(jd.critical)} critical / {len(jd.recommended)} recommended keywords)")
+    return jd.to_dict()
+
+@app.get("/jd/{jd_id}")
+def get_jd(jd_id: str):
+    jd = jd_registry.get(jd_id)
+    if jd is None:
+        raise HTTPException(status_code=404, detail="Job description not found")
+    return jd.to_dict()
+
 @app.post("/score")
-def score_resume(req: ScoreRequest):
+def score_resume(req: ScoreRequest, job: bool = False, priority: str = "normal"):
+    req.job_description = _resolve_jd(req.job_description, req.jd_id)
     logger.info(f"📊 POST /score - Resume length: {len(req.resume_text)} chars | JD length: {len(req.job_description)} chars")
+    if job:
+        return _enqueue_job("score", req.dict(), priority)
     try:
-        result = ATSScorer.calculate_score(req.resume_text, req.job_description, req.metadata)
+        result = ATSScorer.calculate_score(req.resume_text, req.job_description, req.metadata, Deadline(SCORE_DEADLINE))
         logger.info(f"   ✅ Scoring complete. Final score: {result.get('score', 'N/A')}")
         return result
     except Exception as e:
         logger.error(f"   ❌ Score error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/score/multi")
+def score_resume_multi(req: MultiScoreRequest):
+    req.job_descriptions = req.job_descriptions + [_resolve_jd("", jd_id) for jd_id in req.jd_ids]
+    logger.info(f"📊 POST /score/multi - Resume length: {len(req.resume_text)} chars | JDs: {len(req.job_descriptions)} | top_k: {req.top_k}")
+    try:
+        result = ATSScorer.score_many(req.resume_text, req.job_descriptions, req.metadata, req.top_k, Deadline(SCORE_DEADLINE))
+        best = result["results"][0]["score"] if result["results"] else "N/A"
+        logger.info(f"   ✅ Multi-JD scoring complete. Best score: {best}")
+        return result
+    except Exception as e:
+        logger.error(f"   ❌ Multi-score error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/enhance")
 def enhance_text(req: EnhanceRequest):
+    req.job_description = _resolve_jd(req.job_description, req.jd_id)
     logger.info(f"✨ POST /enhance - Provider: {req.provider} | Type: {req.type} | Text length: {len(req.text)}")
     try:
         enhancer = AIEnhancer()
-        enhanced_text = enhancer.enhance_content(req.text, req.provider, req.type, req.job_description)
+        enhanced_text = enhancer.enhance_content(req.text, req.provider, req.type, req.job_description, Deadline(ENHANCE_DEADLINE))
         logger.info(f"   ✅ Enhancement complete. Result length: {len(enhanced_text)}")
         return {"original": req.text, "enhanced": enhanced_text, "type": req.type}
     except Exception as e:
         logger.error(f"   ❌ Enhance error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/enhance/batch")
+def enhance_batch(req: BatchEnhanceRequest):
+    req.job_description = _resolve_jd(req.job_description, req.jd_id)
+    logger.info(f"✨ POST /enhance/batch - Provider: {req.provider} | Segments: {len(req.segments)}")
+    try:
+        enhancer = AIEnhancer()
+        results = enhancer.enhance_many([seg.dict() for seg in req.segments], req.provider, req.job_description, Deadline(ENHANCE_DEADLINE))
+        logger.info(f"   ✅ Batch enhancement complete ({len(results)} segments)")
+        return {"results": results}
+    except Exception as e:
+        logger.error(f"   ❌ Batch enhance error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 class ChatRequest(BaseModel):
     message: str
-    context: str
+    context: Optional[str] = ""
     provider: Optional[str] = "openai"
+    session_id: Optional[str] = None  # continue a session instead of resending context
 
 @app.post("/chat")
-def chat_resume(req: ChatRequest):
-    logger.info(f"💬 POST /chat - Provider: {req.provider} | Message: {req.message[:50]}...")
+def chat_resume(req: ChatRequest, background_tasks: BackgroundTasks):
+    logger.info(f"💬 POST /chat - Provider: {req.provider} | Session: {req.session_id or 'new'} | Message: {req.message[:50]}...")
+    if req.session_id:
+        session = chat_store.get(req.session_id)
+        if session is None:
+            raise HTTPException(status_code=404, detail="Chat session not found or expired. Start a new one with context.")
+    elif req.context:
+        session = chat_store.create(req.context)
+    else:
+        raise HTTPException(status_code=400, detail="Provide either session_id or context")
     try:
         enhancer = AIEnhancer()
-        reply = enhancer.chat_with_context(req.message, req.context, req.provider)
-        logger.info(f"   ✅ Chat reply generated ({len(reply)} chars)")
-        return {"reply": reply}
+        summary, history = session.snapshot()
+        reply = enhancer.chat_with_context(req.message, session.context, req.provider, Deadline(ENHANCE_DEADLINE),
+                                           summary=summary, history=history)
+        if not reply.startswith("Error:"):
+            session.add_exchange(req.message, reply)
+            if session.needs_compaction():
+                background_tasks.add_task(session.compact, lambda s, t: enhancer.summarize_chat(s, t, req.provider))
+        logger.info(f"   ✅ Chat reply generated ({len(reply)} chars, {len(history) // 2} prior turns)")
+        return {"reply": reply, "session_id": session.session_id}
     except Exception as e:
         logger.error(f"   ❌ Chat error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.delete("/chat/{session_id}")
+def end_chat(session_id: str):
+    if not chat_store.delete(session_id):
+        raise HTTPException(status_code=404, detail="Chat session not found")
+    return {"message": "Chat session ended"}
+
 @app.post("/generate")
-def generate_resume(req: GenerateRequest):
-    logger.info(f"📝 POST /generate - Format: {req.format} | Template: {req.template}")
+def generate_resume(req: GenerateRequest, job: bool = False, priority: str = "normal"):
+    logger.info(f"📝 POST /generate - Format: {req.format} | Template: {req.template} | Renderer: {req.renderer or 'default'}"
+                + (f" | Outputs: {len(req.outputs)}" if req.outputs else ""))
+    for target in [req] + list(req.outputs or []):
+        if target.renderer and target.renderer.lower() not in RENDERERS:
+            raise HTTPException(status_code=400, detail=f"Unknown renderer '{target.renderer}'. Use one of {list(RENDERERS)}")
+        if target.format not in FORMATS:
+            raise HTTPException(status_code=400, detail=f"Unsupported format '{target.format}'. Use one of {list(FORMATS)}")
+    if req.outputs is not None and not 0 < len(req.outputs) <= MAX_EXPORT_OUTPUTS:
+        raise HTTPException(status_code=400, detail=f"outputs must list 1-{MAX_EXPORT_OUTPUTS} formats")
+    if job:
+        return _enqueue_job("generate", req.dict(), priority)
     try:
         generator = PDFGenerator()
-        data = req.data.dict()
+        data = Resume.from_dict(req.data)  # validated once, shared by every renderer
+        if req.outputs:
+            export = generator.generate_many(data, [o.dict() for o in req.outputs], req.bundle)
+            logger.info(f"   ✅ Exported {len(export['files'])} files" + (" + zip" if export["zip"] else ""))
+            return export_result(export)
         
-        file_path = generator.generate_resume(data, req.format, req.template)
+        file_path = generator.generate_resume(data, req.format, req.template, req.renderer)
         filename = os.path.basename(file_path)
         logger.info(f"   ✅ Resume generated: {filename}")
         
         return {
             "message": "Resume generated successfully",
             "filename": filename,
-            "url": f"/output/{filename}"
+            "url": file_url(file_path)
         }
     except Exception as e:
         logger.error(f"   ❌ Generate error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    if not job_store:
+        raise HTTPException(status_code=400, detail="Job mode is disabled. Set JOB_MODE=1 to enable it.")
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    job.pop("result")
+    return job
+
+@app.get("/jobs/{job_id}/result")
+def get_job_result(job_id: str):
+    if not job_store:
+        raise HTTPException(status_code=400, detail="Job mode is disabled. Set JOB_MODE=1 to enable it.")
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] == "failed":
+        raise HTTPException(status_code=500, detail=job["error"])
+    if job["status"] != "done":
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    return job["result"]
+
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
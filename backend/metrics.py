@@ -0,0 +1,110 @@
+"""
+Minimal in-process Prometheus metrics (no external dependency).
+Histograms and counters are exported in text exposition format by GET /metrics.
+"""
+import time
+import threading
+from contextlib import contextmanager
+
+_lock = threading.Lock()
+_registry = []
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _label_str(labels: tuple, extra: str = "") -> str:
+    parts = [f'{k}="{v}"' for k, v in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._values = {}
+        _registry.append(self)
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        with _lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with _lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_label_str(key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self._series = {}  # labels -> [bucket_counts, sum, count]
+        _registry.append(self)
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        with _lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with _lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                for bound, c in zip(self.buckets, counts):
+                    le = 'le="%s"' % bound
+                    lines.append(f"{self.name}_bucket{_label_str(key, le)} {c}")
+                inf = 'le="+Inf"'
+                lines.append(f"{self.name}_bucket{_label_str(key, inf)} {count}")
+                lines.append(f"{self.name}_sum{_label_str(key)} {total}")
+                lines.append(f"{self.name}_count{_label_str(key)} {count}")
+        return lines
+
+
+# --- Metric definitions ---
+STAGE_SECONDS = Histogram("resume_stage_duration_seconds", "Time spent in each pipeline stage")
+PROVIDER_SECONDS = Histogram("resume_provider_call_duration_seconds", "Time spent in each AI provider attempt")
+HTTP_SECONDS = Histogram("resume_http_request_duration_seconds", "End-to-end HTTP request latency")
+PROVIDER_FALLBACKS = Counter("resume_provider_fallbacks_total", "Provider failures that fell through to the next provider")
+PROVIDER_TOKENS = Counter("resume_provider_tokens_total", "Tokens consumed per provider")
+CACHE_REQUESTS = Counter("resume_cache_requests_total", "Cache lookups by cache and result (hit/miss)")
+
+
+@contextmanager
+def timed(stage: str):
+    """Time a block (or, as a decorator, a function) into STAGE_SECONDS."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage=stage)
+
+
+def record_tokens(provider: str, prompt_tokens, completion_tokens, cached_tokens=None):
+    PROVIDER_TOKENS.inc(prompt_tokens or 0, provider=provider, kind="prompt")
+    PROVIDER_TOKENS.inc(completion_tokens or 0, provider=provider, kind="completion")
+    if cached_tokens:
+        PROVIDER_TOKENS.inc(cached_tokens, provider=provider, kind="cached_prompt")
+
+
+def record_cache(cache: str, hit: bool):
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def render() -> str:
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -1,15 +1,53 @@
 import os
+import uuid
 import subprocess
-import jinja2
-from docx import Document
 import shutil
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from metrics import timed
+from resume_model import Resume, escape_latex
+from runtime import IS_SERVERLESS, data_path
+
+# "latex" (pdflatex), "native" (in-process, see pdf_renderer.py) or "auto": latex when installed
+PDF_RENDERER = os.getenv("PDF_RENDERER", "auto").lower()
+RENDERERS = ("auto", "latex", "native")
+FORMATS = ("pdf", "docx")
+# Parallel renders per multi-format export; pdflatex runs as a subprocess so threads overlap it fully
+EXPORT_CONCURRENCY = int(os.getenv("EXPORT_CONCURRENCY", "4"))
+
+def file_url(path: str) -> str:
+    """
+    Download URL for a generated file: /output/<name>, or on serverless a data: URL with the
+    file inlined - there /output is not routed to the API and /tmp is private to one instance.
+    """
+    name = os.path.basename(path)
+    if not IS_SERVERLESS:
+        return f"/output/{name}"
+    import base64
+    import mimetypes
+    with open(path, "rb") as f:
+        payload = base64.b64encode(f.read()).decode("ascii")
+    os.remove(path)  # nothing will ever fetch it from this instance's /tmp
+    return f"data:{mimetypes.guess_type(name)[0] or 'application/octet-stream'};base64,{payload}"
+
+def export_result(export: dict) -> dict:
+    """API response for generate_many(): filenames and download URLs instead of local paths."""
+    files = [
+        {"format": f["format"], "template": f["template"], "filename": os.path.basename(f["path"]),
+         "url": file_url(f["path"])}
+        for f in export["files"]
+    ]
+    result = {"message": f"{len(files)} resume files generated successfully", "files": files}
+    if export["zip"]:
+        result["zip"] = {"filename": os.path.basename(export["zip"]), "url": file_url(export["zip"])}
+    return result
 
 class PDFGenerator:
     TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), "templates")
-    _is_serverless = bool(os.getenv("VERCEL")) or bool(os.getenv("VERCEL_ENV")) or bool(os.getenv("AWS_LAMBDA_FUNCTION_NAME"))
-    OUTPUT_DIR = "/tmp/output" if _is_serverless else os.path.join(os.path.dirname(__file__), "output")
+    OUTPUT_DIR = data_path(os.path.join(os.path.dirname(__file__), "output"), "/tmp/output")
 
     def __init__(self):
+        import jinja2  # Lazy: only /generate needs the template engine
         os.makedirs(self.OUTPUT_DIR, exist_ok=True)
         self.jinja_env = jinja2.Environment(
             loader=jinja2.FileSystemLoader(self.TEMPLATE_DIR),
@@ -26,94 +64,149 @@ class PDFGenerator:
         )
 
 
-    def generate_resume(self, data: dict, format: str = "pdf", template_name: str = "classic") -> str:
+    def generate_resume(self, data, format: str = "pdf", template_name: str = "classic", renderer: str = None) -> str:
+        """`data` is a Resume or raw resume dict."""
+        return self._render(self._document(data), format, template_name, renderer, f"_{self._request_id()}")
+
+    @staticmethod
+    def _document(data) -> Resume:
+        return data if isinstance(data, Resume) else Resume.from_dict(data)
+
+    def generate_many(self, data, outputs: list, bundle: bool = False) -> dict:
+        """
+        Render several {"format", "template", "renderer"} outputs from one Resume model,
+        concurrently. Returns {"files": [{"format", "template", "path"}], "zip": path or None}.
+        PDFs get the template in their filename so designs don't overwrite each other.
+        """
+        doc = self._document(data)
+        request_id = self._request_id()
+        targets, seen = [], set()
+        for out in outputs:
+            fmt = out.get("format") or "pdf"
+            template = (out.get("template") or "classic") if fmt == "pdf" else None
+            if fmt not in FORMATS:
+                raise ValueError(f"Unsupported format: {fmt}")
+            if (fmt, template) not in seen:
+                seen.add((fmt, template))
+                targets.append((fmt, template, out.get("renderer")))
+
+        with timed("export_many"):
+            with ThreadPoolExecutor(max_workers=max(1, min(EXPORT_CONCURRENCY, len(targets)))) as pool:
+                futures = [
+                    pool.submit(self._render, doc, fmt, template, renderer,
+                                f"_{template}_{request_id}" if fmt == "pdf" else f"_{request_id}")
+                    for fmt, template, renderer in targets
+                ]
+                files = [
+                    {"format": fmt, "template": template, "path": future.result()}
+                    for (fmt, template, _), future in zip(targets, futures)
+                ]
+
+        zip_path = None
+        if bundle:
+            zip_path = os.path.join(self.OUTPUT_DIR, self._output_name(doc, "zip", f"_{request_id}"))
+            with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
+                for f in files:
+                    zf.write(f["path"], os.path.basename(f["path"]))
+        return {"files": files, "zip": zip_path}
+
+    def _render(self, doc: Resume, format: str, template_name: str, renderer: str = None, suffix: str = "") -> str:
         if format == "pdf":
-            return self._generate_pdf(data, template_name)
+            if self._resolve_renderer(renderer) == "native":
+                return self._generate_pdf_native(doc, template_name, suffix)
+            return self._generate_pdf(doc, template_name, suffix)
         elif format == "docx":
-            return self._generate_docx(data)
+            return self._generate_docx(doc, suffix)
         else:
             raise ValueError("Unsupported format")
 
+    def _resolve_renderer(self, renderer: str = None) -> str:
+        renderer = (renderer or PDF_RENDERER).lower()
+        if renderer not in RENDERERS:
+            raise ValueError(f"Unsupported renderer: {renderer}. Use one of {list(RENDERERS)}")
+        if renderer == "auto":
+            return "latex" if self._find_pdflatex() else "native"
+        return renderer
+
+    @staticmethod
+    def _find_pdflatex() -> bool:
+        # Check if pdflatex is available in PATH, if not check common Mac locations
+        if not shutil.which("pdflatex"):
+            # Common MacTeX paths
+            possible_paths = ["/Library/TeX/texbin", "/usr/local/bin", "/usr/texbin"]
+            for p in possible_paths:
+                if os.path.exists(os.path.join(p, "pdflatex")):
+                    os.environ["PATH"] += os.pathsep + p
+                    break
+        return bool(shutil.which("pdflatex"))
+
+    @staticmethod
+    def _request_id() -> str:
+        """Per-request filename component: same-named resumes rendered concurrently must not share files."""
+        return uuid.uuid4().hex[:12]
+
+    def _output_name(self, doc: Resume, ext: str, suffix: str = "") -> str:
+        raw_name = doc.name or 'user'
+        safe_name = "".join([c if c.isalnum() else "_" for c in raw_name])
+        return f"resume_{safe_name}{suffix}.{ext}"
+
     def escape_latex(self, text: str) -> str:
         """Escape LaTeX special characters."""
-        if not isinstance(text, str):
-            return text
-        chars = {
-            "&": r"\&",
-            "%": r"\%",
-            "$": r"\$",
-            "#": r"\#",
-            "_": r"\_",
-            "{": r"\{",
-            "}": r"\}",
-            "~": r"\textasciitilde{}",
-            "^": r"\textasciicircum{}",
-            "\\": r"\textbackslash{}",
-        }
-        escaped = ""
-        for char in text:
-            escaped += chars.get(char, char)
-        return escaped
+        return escape_latex(text)
 
     def sanitize_data(self, data):
         """Recursively escape strings in data for LaTeX."""
+        if isinstance(data, Resume):
+            return data.latex()
         if isinstance(data, dict):
             return {k: self.sanitize_data(v) for k, v in data.items()}
         elif isinstance(data, list):
             return [self.sanitize_data(v) for v in data]
-        elif isinstance(data, str):
-            return self.escape_latex(data)
-        else:
-            return data
+        return escape_latex(data)
 
-    def _generate_pdf(self, data: dict, template_name: str) -> str:
+    def _generate_pdf(self, doc: Resume, template_name: str, suffix: str = "") -> str:
         try:
-            # save raw name for filename
-            raw_name = data.get('name', 'user')
-            
-            # Escape special LaTeX characters in data (returns new dict)
-            sanitized_data = self.sanitize_data(data)
+            # LaTeX-escaped view, built once per document and shared across templates
+            sanitized_data = doc.latex()
 
             # Ensure template exists, default to classic if not found
             if not os.path.exists(os.path.join(self.TEMPLATE_DIR, f"{template_name}.tex")):
                 template_name = "classic"
             
-            template = self.jinja_env.get_template(f"{template_name}.tex")
-            rendered_tex = template.render(**sanitized_data)
+            with timed("latex_render"):
+                template = self.jinja_env.get_template(f"{template_name}.tex")
+                rendered_tex = template.render(**sanitized_data)
             
-            # Sanitize filename
-            safe_name = "".join([c if c.isalnum() else "_" for c in raw_name])
-            tex_filename = f"resume_{safe_name}.tex"
+            tex_filename = self._output_name(doc, "tex", suffix)
             tex_path = os.path.join(self.OUTPUT_DIR, tex_filename)
             
             with open(tex_path, "w") as f:
                 f.write(rendered_tex)
             
             # Compile with pdflatex
-            # Check if pdflatex is available in PATH, if not check common Mac locations
-            if not shutil.which("pdflatex"):
-                # Common MacTeX paths
-                possible_paths = ["/Library/TeX/texbin", "/usr/local/bin", "/usr/texbin"]
-                for p in possible_paths:
-                    if os.path.exists(os.path.join(p, "pdflatex")):
-                        os.environ["PATH"] += os.pathsep + p
-                        break
-            
-            if not shutil.which("pdflatex"):
-                 raise EnvironmentError("pdflatex not found. Please install TeX distribution.")
-
-            subprocess.run(
-                ["pdflatex", "-interaction=nonstopmode", "-halt-on-error", "-output-directory", self.OUTPUT_DIR, tex_path],
-                check=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
-            )
+            if not self._find_pdflatex():
+                 raise EnvironmentError("pdflatex not found. Please install TeX distribution or use renderer='native'.")
+
+            with timed("pdflatex_compile"):
+                subprocess.run(
+                    ["pdflatex", "-interaction=nonstopmode", "-halt-on-error", "-output-directory", self.OUTPUT_DIR, tex_path],
+                    check=True,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE
+                )
             
             pdf_filename = tex_filename.replace(".tex", ".pdf")
             return os.path.join(self.OUTPUT_DIR, pdf_filename)
         except Exception as e:
              raise RuntimeError(f"PDF Generation failed: {str(e)}")
 
+    def _generate_pdf_native(self, doc: Resume, template_name: str, suffix: str = "") -> str:
+        from pdf_renderer import render_pdf
+        try:
+            return render_pdf(doc.as_dict(), template_name, os.path.join(self.OUTPUT_DIR, self._output_name(doc, "pdf", suffix)))
+        except Exception as e:
+            raise RuntimeError(f"PDF Generation failed: {str(e)}")
+
     def _get_minimal_template(self):
         return r"""
 \documentclass[11pt,a4paper]{article}
@@ -147,29 +240,30 @@ VAR_SKILLS
 \end{document}
 """
 
-    def _generate_docx(self, data: dict) -> str:
+    def _generate_docx(self, resume: Resume, suffix: str = "") -> str:
+        from docx import Document
         doc = Document()
-        doc.add_heading(data.get('name', 'Name'), 0)
+        doc.add_heading(resume.name or 'Name', 0)
         
-        doc.add_paragraph(f"{data.get('email', '')} | {data.get('phone', '')} | {data.get('location', '')}")
+        doc.add_paragraph(f"{resume.email} | {resume.phone} | {resume.location}")
         
         doc.add_heading('Summary', level=1)
-        doc.add_paragraph(data.get('summary', ''))
+        doc.add_paragraph(resume.summary)
         
         doc.add_heading('Experience', level=1)
-        for job in data.get('experience', []):
+        for job in resume.experience:
             p = doc.add_paragraph()
-            p.add_run(f"{job.get('role')} at {job.get('company')}").bold = True
-            p.add_run(f"\n{job.get('dates')} | {job.get('location')}")
-            for detail in job.get('details', []):
+            p.add_run(f"{job.role} at {job.company}").bold = True
+            p.add_run(f"\n{job.dates} | {job.location}")
+            for detail in job.details:
                 doc.add_paragraph(detail, style='List Bullet')
                 
         doc.add_heading('Education', level=1)
-        for edu in data.get('education', []):
-            doc.add_paragraph(f"{edu.get('degree')} - {edu.get('school')}")
-            doc.add_paragraph(f"{edu.get('dates')} | {edu.get('location')}")
+        for edu in resume.education:
+            doc.add_paragraph(f"{edu.degree} - {edu.school}")
+            doc.add_paragraph(f"{edu.dates} | {edu.location}")
 
-        filename = f"resume_{data.get('name', 'user').replace(' ', '_')}.docx"
+        filename = self._output_name(resume, "docx", suffix)
         file_path = os.path.join(self.OUTPUT_DIR, filename)
         doc.save(file_path)
         return file_path
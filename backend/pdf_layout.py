@@ -0,0 +1,224 @@
+"""
+Layout-aware PDF text extraction.
+
+One pypdf pass per page collects every text fragment with its position, font
+and size (visitor callback). From those fragments we rebuild reading order
+(column by column) and derive layout features - column count, table regions
+and fonts used - that ATSAnalyzer consumes directly instead of guessing from
+runs of spaces in flattened text.
+
+Columns are looked for across the whole page first. When a page mixes layouts
+(a two-column section above a three-column table) no gutter runs the full
+height, so the page is cut into vertical bands at blank horizontal strips and
+each band is read on its own.
+"""
+import re
+from collections import Counter
+
+_SUBSET_PREFIX = re.compile(r"^[A-Z]{6}\+")
+CHAR_WIDTH_EM = 0.5          # average glyph width estimate (fraction of font size)
+GUTTER_MIN_WIDTH = 12.0      # points of empty horizontal space to count as a column gutter
+GUTTER_BIN = 4.0
+MIN_COLUMN_SHARE = 0.2       # each side of a gutter must hold this share of the page's text
+TABLE_MIN_ROWS = 3
+TABLE_MIN_CELLS = 3
+TABLE_CELL_GAP_EM = 2.0      # gap between fragments on a line that separates table cells
+BAND_GAP_EM = 1.6            # vertical gap between lines (x font size) that starts a new band
+TABLE_BAND_SHARE = 0.6       # a band whose lines are mostly table rows is read as a table, not columns
+
+
+def _font_name(font_dict) -> str:
+    try:
+        name = str(font_dict["/BaseFont"]).lstrip("/")
+    except (KeyError, TypeError):
+        return "unknown"
+    return _SUBSET_PREFIX.sub("", name)
+
+
+def _collect_fragments(page) -> list:
+    """[{"x", "y", "text", "font", "size"}] for one page, in content-stream order."""
+    fragments = []
+
+    def visitor(text, cm, tm, font_dict, font_size):
+        if not text or not text.strip():
+            return
+        # Text space -> user space: tm then cm
+        a = tm[0] * cm[0] + tm[1] * cm[2]
+        b = tm[0] * cm[1] + tm[1] * cm[3]
+        x = tm[4] * cm[0] + tm[5] * cm[2] + cm[4]
+        y = tm[4] * cm[1] + tm[5] * cm[3] + cm[5]
+        size = abs(font_size * (a * a + b * b) ** 0.5) or font_size or 10.0
+        fragments.append({"x": x, "y": y, "text": text.replace("\n", " "), "font": _font_name(font_dict), "size": size})
+
+    page.extract_text(visitor_text=visitor)
+    return fragments
+
+
+def _width(fragment: dict) -> float:
+    return len(fragment["text"]) * fragment["size"] * CHAR_WIDTH_EM
+
+
+def _find_gutters(fragments: list) -> list:
+    """x positions of vertical empty bands with enough text on both sides."""
+    if len(fragments) < 10:
+        return []
+    left = min(f["x"] for f in fragments)
+    right = max(f["x"] + _width(f) for f in fragments)
+    bins = int((right - left) / GUTTER_BIN) + 1
+    coverage = [0] * bins
+    for f in fragments:
+        start = int((f["x"] - left) / GUTTER_BIN)
+        end = int((f["x"] + _width(f) - left) / GUTTER_BIN)
+        for i in range(start, min(end, bins - 1) + 1):
+            coverage[i] += 1
+
+    # Fragments spanning the gutter (name, section rules) are allowed at a low rate
+    allowed = max(1, len(fragments) // 50)
+    gutters, run_start = [], None
+    for i, count in enumerate(coverage + [allowed + 1]):
+        if count <= allowed and run_start is None:
+            run_start = i
+        elif count > allowed and run_start is not None:
+            if (i - run_start) * GUTTER_BIN >= GUTTER_MIN_WIDTH and run_start > 0 and i < bins:
+                gutters.append(left + (run_start + i) / 2 * GUTTER_BIN)
+            run_start = None
+
+    total = len(fragments)
+    bounds = [float("-inf")] + gutters + [float("inf")]
+    shares = [sum(lo <= f["x"] < hi for f in fragments) / total for lo, hi in zip(bounds, bounds[1:])]
+    if gutters and min(shares) < MIN_COLUMN_SHARE:
+        return []
+    return gutters
+
+
+def _lines(fragments: list) -> list:
+    """Group fragments into lines (top to bottom), each a list sorted left to right."""
+    lines = []
+    for f in sorted(fragments, key=lambda f: (-f["y"], f["x"])):
+        if lines and abs(lines[-1][0]["y"] - f["y"]) <= 0.5 * f["size"]:
+            lines[-1].append(f)
+        else:
+            lines.append([f])
+    return [sorted(line, key=lambda f: f["x"]) for line in lines]
+
+
+def _join(line: list) -> str:
+    out, prev = "", None
+    for f in line:
+        text = f["text"]
+        if prev is not None and not out.endswith(" ") and not text.startswith(" "):
+            if f["x"] - (prev["x"] + _width(prev)) > -0.3 * f["size"]:
+                out += " "
+        out += text
+        prev = f
+    return re.sub(r"[ \t]{2,}", " ", out).strip()
+
+
+def _table_regions(lines: list, page_no: int) -> list:
+    """Runs of consecutive lines split into several widely spaced cells."""
+    regions, run = [], []
+
+    def cells(line):
+        count, prev = 1, line[0]
+        for f in line[1:]:
+            if f["x"] - (prev["x"] + _width(prev)) > TABLE_CELL_GAP_EM * f["size"]:
+                count += 1
+            prev = f
+        return count
+
+    for line in lines + [None]:
+        n = cells(line) if line else 0
+        if n >= TABLE_MIN_CELLS:
+            run.append((line, n))
+            continue
+        if len(run) >= TABLE_MIN_ROWS:
+            regions.append({
+                "page": page_no,
+                "top": round(run[0][0][0]["y"], 1),
+                "bottom": round(run[-1][0][0]["y"], 1),
+                "rows": len(run),
+                "columns": max(n for _, n in run),
+            })
+        run = []
+    return regions
+
+
+def _bands(fragments: list) -> list:
+    """Split a page's fragments into vertical bands at blank horizontal strips."""
+    bands = []
+    prev = None
+    for line in _lines(fragments):
+        y, size = line[0]["y"], max(f["size"] for f in line)
+        if prev is None or prev - y > BAND_GAP_EM * size:
+            bands.append([])
+        bands[-1].extend(line)
+        prev = y
+    return bands
+
+
+def _read_region(fragments: list, gutters: list, page_no: int, tables: list) -> str:
+    """Text of one region in reading order, given its column gutters. Appends table regions found."""
+    # Full-width content (a centered name, a contact banner) either crosses a gutter or
+    # sits above everything in the other columns; it is read before/after the columns
+    bounds = [float("-inf")] + gutters + [float("inf")]
+    spanning = [f for f in fragments if any(f["x"] < g < f["x"] + _width(f) for g in gutters)]
+    columns = [[f for f in fragments if lo <= f["x"] < hi and f not in spanning] for lo, hi in zip(bounds, bounds[1:])]
+    if len(columns) > 1:
+        tops = [max((f["y"] for f in col), default=float("-inf")) for col in columns]
+        for i, col in enumerate(columns):
+            others_top = max(t for j, t in enumerate(tops) if j != i)
+            spanning += [f for f in col if f["y"] > others_top + 0.5 * f["size"]]
+            columns[i] = [f for f in col if f["y"] <= others_top + 0.5 * f["size"]]
+    columns_top = max((f["y"] for col in columns for f in col), default=0.0)
+    above = [f for f in spanning if f["y"] > columns_top]
+    below = [f for f in spanning if f["y"] <= columns_top]
+    blocks = []
+    for group in [above] + columns + [below]:
+        group_lines = _lines(group)
+        tables.extend(_table_regions(group_lines, page_no))
+        blocks.append("\n".join(_join(line) for line in group_lines))
+    return "\n".join(b for b in blocks if b)
+
+
+def _band_gutters(band: list) -> list:
+    """Gutters of a page or band; none when it is mostly a table (its cells are not columns)."""
+    lines = _lines(band)
+    table_rows = sum(t["rows"] for t in _table_regions(lines, 0))
+    if lines and table_rows / len(lines) >= TABLE_BAND_SHARE:
+        return []
+    return _find_gutters(band)
+
+
+def extract(reader) -> tuple:
+    """(text, layout) for a pypdf PdfReader, using one visitor pass per page."""
+    page_texts, columns_per_page, tables = [], [], []
+    fonts, sizes = Counter(), Counter()
+    for page_no, page in enumerate(reader.pages, start=1):
+        fragments = _collect_fragments(page)
+        for f in fragments:
+            fonts[f["font"]] += len(f["text"])
+            sizes[round(f["size"])] += len(f["text"])
+
+        gutters = _band_gutters(fragments)
+        bands = [fragments] if gutters else _bands(fragments)
+        if len(bands) == 1:
+            columns_per_page.append(len(gutters) + 1)
+            page_texts.append(_read_region(fragments, gutters, page_no, tables))
+            continue
+        band_texts, band_columns = [], []
+        for band in bands:
+            band_gutters = _band_gutters(band)
+            band_columns.append(len(band_gutters) + 1)
+            band_texts.append(_read_region(band, band_gutters, page_no, tables))
+        columns_per_page.append(max(band_columns))
+        page_texts.append("\n".join(t for t in band_texts if t))
+
+    layout = {
+        "pages": len(page_texts),
+        "columns": max(columns_per_page, default=1),
+        "columns_per_page": columns_per_page,
+        "tables": tables,
+        "fonts": [{"name": name, "chars": chars} for name, chars in fonts.most_common()],
+        "font_sizes": sorted(sizes),
+    }
+    return "\n".join(page_texts).strip(), layout
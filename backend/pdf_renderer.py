@@ -0,0 +1,246 @@
+"""
+In-process PDF renderer for the classic / modern / minimal resume designs.
+
+Lays the same sections out directly with fpdf2 and the built-in PDF core
+fonts, so no TeX installation or subprocess is needed. Used by PDFGenerator
+when renderer="native" (or "auto" without pdflatex, e.g. on serverless).
+"""
+from metrics import timed
+
+PT_PER_INCH = 72.0
+
+# Layout per template, mirroring templates/<name>.tex
+TEMPLATES = {
+    "classic": {
+        "font": "Times", "size": 11, "name_size": 20, "section_size": 14, "margin": 1.0 * PT_PER_INCH,
+        "contact_sep": " | ", "links": False, "header_rule": True, "section_rule": False,
+        "section_upper": False, "section_color": (0, 0, 0),
+        "sections": [("summary", "Professional Summary"), ("experience", "Experience"),
+                     ("education", "Education"), ("skills", "Skills")],
+        "skills_as_list": False,
+    },
+    "modern": {
+        "font": "Helvetica", "size": 10, "name_size": 24, "section_size": 12, "margin": 0.5 * PT_PER_INCH,
+        "contact_sep": " \xb7 ", "links": True, "header_rule": False, "section_rule": True,
+        "section_upper": False, "section_color": (59, 130, 246),
+        "sections": [("summary", "Summary"), ("experience", "Experience"), ("skills", "Skills"),
+                     ("projects", "Projects"), ("education", "Education")],
+        "skills_as_list": True,
+    },
+    "minimal": {
+        "font": "Times", "size": 11, "name_size": 22, "section_size": 12, "margin": 0.75 * PT_PER_INCH,
+        "contact_sep": " | ", "links": False, "header_rule": False, "section_rule": True,
+        "section_upper": True, "section_color": (0, 0, 0),
+        "sections": [("summary", "Summary"), ("experience", "Experience"),
+                     ("education", "Education"), ("skills", "Skills")],
+        "skills_as_list": True,
+    },
+}
+
+# Core PDF fonts only cover Latin-1; map the usual typographic characters first
+_REPLACEMENTS = {
+    "\u2018": "'", "\u2019": "'", "\u201c": '"', "\u201d": '"', "\u2013": "-", "\u2014": "-",
+    "\u2022": "\xb7", "\u2026": "...", "\u2122": "(TM)",
+}
+
+
+def _latin1(text) -> str:
+    if not isinstance(text, str):
+        text = "" if text is None else str(text)
+    for src, dst in _REPLACEMENTS.items():
+        text = text.replace(src, dst)
+    return text.encode("latin-1", "replace").decode("latin-1")
+
+
+class _Layout:
+    def __init__(self, style: dict):
+        from fpdf import FPDF  # Lazy: only the native renderer needs it
+        from fpdf.enums import XPos, YPos
+        self.XPos, self.YPos = XPos, YPos
+        self.style = style
+        self.font = style["font"]
+        self.size = style["size"]
+        self.line_h = style["size"] * 1.25
+        self.pdf = FPDF(format="A4", unit="pt")
+        self.pdf.set_margins(style["margin"], style["margin"], style["margin"])
+        self.pdf.set_auto_page_break(True, style["margin"])
+        self.pdf.add_page()
+        self.width = self.pdf.w - 2 * style["margin"]
+
+    def text_line(self, text: str, emphasis: str = "", size: float = None, align: str = "L", link: str = ""):
+        self.pdf.set_font(self.font, emphasis, size or self.size)
+        self.pdf.cell(self.width, (size or self.size) * 1.25, _latin1(text), align=align, link=link,
+                      new_x=self.XPos.LMARGIN, new_y=self.YPos.NEXT)
+
+    def wrap(self, text: str, width: float, first_width: float = None) -> list:
+        """
+        Greedy word wrap using the current font's metrics. Measuring whole words is far
+        cheaper than fpdf's per-character multi_cell line breaking on long resumes.
+        """
+        # Core fonts expose their glyph widths (1/1000 em); summing them directly skips
+        # fpdf's per-call text shaping, which dominates render time otherwise
+        widths, scale = self.pdf.current_font.cw, self.pdf.font_size / 1000.0
+        measure = lambda s: sum(widths.get(c, 500) for c in s) * scale
+        space = measure(" ")
+        lines, current, used = [], [], 0.0
+        limit = first_width if first_width is not None else width
+        for word in text.split():
+            w = measure(word)
+            if current and used + space + w > limit:
+                lines.append(" ".join(current))
+                current, used, limit = [], 0.0, width
+            used += (space if current else 0.0) + w
+            current.append(word)
+        if current or not lines:
+            lines.append(" ".join(current))
+        return lines
+
+    def write_lines(self, lines: list, x: float):
+        for i, line in enumerate(lines):
+            if i:
+                self.pdf.set_x(x)
+            self.pdf.cell(0, self.line_h, line, new_x=self.XPos.LMARGIN, new_y=self.YPos.NEXT)
+
+    def paragraph(self, text: str, indent: float = 0):
+        self.pdf.set_font(self.font, "", self.size)
+        x = self.pdf.l_margin + indent
+        self.pdf.set_x(x)
+        self.write_lines(self.wrap(_latin1(text), self.width - indent), x)
+
+    def split_row(self, left: str, right: str, left_emphasis: str):
+        """`left \\hfill right` on one line."""
+        right = _latin1(right)
+        self.pdf.set_font(self.font, "", self.size)
+        right_w = self.pdf.get_string_width(right) + 2
+        self.pdf.set_font(self.font, left_emphasis, self.size)
+        self.pdf.cell(self.width - right_w, self.line_h, _latin1(left))
+        self.pdf.set_font(self.font, "", self.size)
+        self.pdf.cell(right_w, self.line_h, right, align="R", new_x=self.XPos.LMARGIN, new_y=self.YPos.NEXT)
+
+    def bullet(self, text: str, bold_prefix: str = ""):
+        indent = self.size * 1.6
+        radius = self.size * 0.16
+        if self.pdf.will_page_break(self.line_h):
+            self.pdf.add_page()  # keep the bullet mark on the same page as its text
+        y = self.pdf.get_y()
+        self.pdf.set_fill_color(0, 0, 0)
+        self.pdf.ellipse(self.pdf.l_margin + indent * 0.45, y + self.line_h / 2 - radius, 2 * radius, 2 * radius, style="F")
+        self.pdf.set_x(self.pdf.l_margin + indent)
+        if bold_prefix:
+            self.pdf.set_font(self.font, "B", self.size)
+            prefix = _latin1(bold_prefix) + " "
+            prefix_w = self.pdf.get_string_width(prefix)
+            self.pdf.cell(prefix_w, self.line_h, prefix)
+            self.pdf.set_font(self.font, "", self.size)
+            # Continuation lines hang under the bullet text, not under the bold label
+            self.write_lines(self.wrap(_latin1(text), self.width - indent, self.width - indent - prefix_w),
+                             self.pdf.l_margin + indent)
+        else:
+            self.paragraph(text, indent)
+
+    def rule(self, gap_after: float = 4):
+        y = self.pdf.get_y()
+        self.pdf.line(self.pdf.l_margin, y, self.pdf.l_margin + self.width, y)
+        self.pdf.ln(gap_after)
+
+    def section(self, title: str):
+        style = self.style
+        self.pdf.ln(self.size * 0.8)
+        self.pdf.set_text_color(*style["section_color"])
+        self.pdf.set_draw_color(*style["section_color"])
+        self.text_line(title.upper() if style["section_upper"] else title, "B", style["section_size"])
+        self.pdf.set_text_color(0, 0, 0)
+        if style["section_rule"]:
+            self.rule()
+        self.pdf.set_draw_color(0, 0, 0)
+        self.pdf.ln(2)
+
+
+def _header(layout: _Layout, data: dict):
+    style = layout.style
+    layout.text_line(data.get("name", ""), "B", style["name_size"], "C")
+    contact = style["contact_sep"].join(_latin1(data.get(k) or "") for k in ("email", "phone", "location"))
+    layout.text_line(contact, align="C")
+    if style["links"]:
+        links = [(label, data.get(key)) for label, key in (("LinkedIn", "linkedin"), ("GitHub", "github")) if data.get(key)]
+        if links:
+            pdf = layout.pdf
+            pdf.set_font(layout.font, "", layout.size)
+            sep = _latin1(style["contact_sep"])
+            total = sum(pdf.get_string_width(label) for label, _ in links) + pdf.get_string_width(sep) * (len(links) - 1)
+            pdf.set_x(pdf.l_margin + (layout.width - total) / 2)
+            for i, (label, url) in enumerate(links):
+                if i:
+                    pdf.cell(pdf.get_string_width(sep), layout.line_h, sep)
+                pdf.cell(pdf.get_string_width(label), layout.line_h, label, link=url)
+            pdf.ln(layout.line_h)
+    if style["header_rule"]:
+        layout.pdf.ln(4)
+        layout.rule(layout.size)
+
+
+def _experience(layout: _Layout, data: dict):
+    for job in data.get("experience") or []:
+        layout.split_row(job.get("role", ""), job.get("dates", ""), "B")
+        layout.split_row(job.get("company", ""), job.get("location", ""), "I")
+        for detail in job.get("details") or []:
+            layout.bullet(detail)
+        layout.pdf.ln(layout.size * 0.4)
+
+
+def _education(layout: _Layout, data: dict):
+    for edu in data.get("education") or []:
+        layout.split_row(edu.get("degree", ""), edu.get("dates", ""), "B")
+        layout.split_row(edu.get("school", ""), edu.get("location", ""), "I")
+        layout.pdf.ln(layout.size * 0.4)
+
+
+def _skills(layout: _Layout, data: dict):
+    for category, skills in (data.get("skills") or {}).items():
+        items = ", ".join(skills) if isinstance(skills, list) else str(skills)
+        if layout.style["skills_as_list"]:
+            layout.bullet(items, f"{category}:")
+        else:
+            pdf = layout.pdf
+            pdf.set_font(layout.font, "B", layout.size)
+            label = _latin1(f"{category}: ")
+            label_w = pdf.get_string_width(label)
+            pdf.cell(label_w, layout.line_h, label)
+            pdf.set_font(layout.font, "", layout.size)
+            layout.write_lines(layout.wrap(_latin1(items), layout.width, layout.width - label_w), pdf.l_margin)
+
+
+def _projects(layout: _Layout, data: dict):
+    for project in data.get("projects") or []:
+        pdf = layout.pdf
+        pdf.set_font(layout.font, "B", layout.size)
+        pdf.cell(layout.width - 40, layout.line_h, _latin1(project.get("name", "")))
+        pdf.set_font(layout.font, "", layout.size)
+        link = project.get("link") or ""
+        pdf.cell(40, layout.line_h, "Link" if link else "", align="R", link=link,
+                 new_x=layout.XPos.LMARGIN, new_y=layout.YPos.NEXT)
+        if project.get("description"):
+            layout.paragraph(project["description"])
+        pdf.ln(layout.size * 0.4)
+
+
+_SECTIONS = {
+    "summary": lambda layout, data: layout.paragraph(data.get("summary", "")),
+    "experience": _experience,
+    "education": _education,
+    "skills": _skills,
+    "projects": _projects,
+}
+
+
+@timed("native_pdf_render")
+def render_pdf(data: dict, template_name: str, path: str) -> str:
+    """Render resume data to `path` using the named design (falls back to classic)."""
+    style = TEMPLATES.get(template_name, TEMPLATES["classic"])
+    layout = _Layout(style)
+    _header(layout, data)
+    for key, title in style["sections"]:
+        layout.section(title)
+        _SECTIONS[key](layout, data)
+    layout.pdf.output(path)
+    return path
@@ -0,0 +1,145 @@
+"""
+Typed, read-only resume document model.
+
+Built once from /generate request data (Resume.from_dict) and then shared by
+every renderer. Derived views - plain dict and LaTeX-escaped dict - are computed
+on first use and cached on the instance, so exporting several formats never
+re-walks or re-escapes the nested data. Scoring works on text extracted from
+uploaded files and does not use this model.
+"""
+from dataclasses import dataclass, field
+from typing import Tuple
+
+_LATEX_ESCAPES = str.maketrans({
+    "&": r"\&",
+    "%": r"\%",
+    "$": r"\$",
+    "#": r"\#",
+    "_": r"\_",
+    "{": r"\{",
+    "}": r"\}",
+    "~": r"\textasciitilde{}",
+    "^": r"\textasciicircum{}",
+    "\\": r"\textbackslash{}",
+})
+
+
+def escape_latex(text):
+    """Escape LaTeX special characters; non-strings pass through."""
+    return text.translate(_LATEX_ESCAPES) if isinstance(text, str) else text
+
+
+def _latex_view(value):
+    if isinstance(value, dict):
+        return {k: _latex_view(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_latex_view(v) for v in value]
+    return escape_latex(value)
+
+
+def _text(value) -> str:
+    return "" if value is None else str(value).strip()
+
+
+def _items(value) -> Tuple[str, ...]:
+    """Non-empty strings from a list, or from a newline/bullet separated string."""
+    if isinstance(value, str):
+        value = [line.lstrip("•-* ") for line in value.splitlines()]
+    return tuple(t for t in (_text(v) for v in (value or [])) if t)
+
+
+@dataclass(frozen=True, slots=True)
+class Experience:
+    role: str = ""
+    company: str = ""
+    dates: str = ""
+    location: str = ""
+    details: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Experience":
+        return cls(_text(d.get("role")), _text(d.get("company")), _text(d.get("dates")),
+                   _text(d.get("location")), _items(d.get("details")))
+
+
+@dataclass(frozen=True, slots=True)
+class Education:
+    degree: str = ""
+    school: str = ""
+    dates: str = ""
+    location: str = ""
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Education":
+        return cls(_text(d.get("degree")), _text(d.get("school")), _text(d.get("dates")), _text(d.get("location")))
+
+
+@dataclass(frozen=True, slots=True)
+class Project:
+    name: str = ""
+    link: str = ""
+    description: str = ""
+    tech: str = ""
+    details: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Project":
+        return cls(_text(d.get("name")), _text(d.get("link")), _text(d.get("description")),
+                   _text(d.get("tech")), _items(d.get("details")))
+
+
+@dataclass(frozen=True, slots=True)
+class Resume:
+    name: str = ""
+    email: str = ""
+    phone: str = ""
+    location: str = ""
+    linkedin: str = ""
+    github: str = ""
+    summary: str = ""
+    experience: Tuple[Experience, ...] = ()
+    education: Tuple[Education, ...] = ()
+    projects: Tuple[Project, ...] = ()
+    skills: Tuple[Tuple[str, Tuple[str, ...]], ...] = ()   # ((category, (skill, ...)), ...) in input order
+    _views: dict = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    @classmethod
+    def from_dict(cls, data) -> "Resume":
+        """Validate and normalize request data (a dict or a pydantic model) once."""
+        if not isinstance(data, dict):
+            data = dict(data)  # pydantic model: shallow field mapping, no deep copy
+        skills = data.get("skills") or {}
+        return cls(
+            *(_text(data.get(k)) for k in ("name", "email", "phone", "location", "linkedin", "github", "summary")),
+            experience=tuple(Experience.from_dict(j) for j in data.get("experience") or [] if isinstance(j, dict)),
+            education=tuple(Education.from_dict(e) for e in data.get("education") or [] if isinstance(e, dict)),
+            projects=tuple(Project.from_dict(p) for p in data.get("projects") or [] if isinstance(p, dict)),
+            skills=tuple(
+                (_text(category), _items(items.split(",") if isinstance(items, str) else items))
+                for category, items in (skills.items() if isinstance(skills, dict) else [])
+            ),
+        )
+
+    def _cached(self, key: str, build):
+        view = self._views.get(key)
+        if view is None:
+            view = self._views[key] = build()
+        return view
+
+    def as_dict(self) -> dict:
+        """Plain nested dict (template/renderer input). Cached; treat as read-only."""
+        return self._cached("dict", lambda: {
+            "name": self.name, "email": self.email, "phone": self.phone, "location": self.location,
+            "linkedin": self.linkedin, "github": self.github, "summary": self.summary,
+            "experience": [{"role": j.role, "company": j.company, "dates": j.dates, "location": j.location,
+                            "details": list(j.details)} for j in self.experience],
+            "education": [{"degree": e.degree, "school": e.school, "dates": e.dates, "location": e.location}
+                          for e in self.education],
+            "projects": [{"name": p.name, "link": p.link, "description": p.description, "tech": p.tech,
+                          "details": list(p.details)} for p in self.projects],
+            "skills": {category: list(items) for category, items in self.skills},
+        })
+
+    def latex(self) -> dict:
+        """as_dict() with every string LaTeX-escaped. Cached; treat as read-only."""
+        return self._cached("latex", lambda: _latex_view(self.as_dict()))
@@ -1,17 +1,30 @@
 import os
 import re
-from pypdf import PdfReader
-from docx import Document
+from metrics import timed
+
+# Layout-aware PDF parsing (column reading order, table/font features) for every PDF when set;
+# off by default, per request via ResumeParser.extract_data(path, layout=True)
+PDF_LAYOUT_PARSING = os.getenv("PDF_LAYOUT_PARSING", "").lower() in ("1", "true", "yes")
 
 class ResumeParser:
     @staticmethod
-    def extract_data(file_path: str) -> dict:
-        """Extracts text and basic metadata from a file."""
-        text = ResumeParser.extract_text(file_path)
+    @timed("parse")
+    def extract_data(file_path: str, layout: bool = None) -> dict:
+        """
+        Extracts text and basic metadata from a file. With layout=True (PDF only) the
+        text follows column reading order and a "layout" dict is included for ATSAnalyzer.
+        """
+        if layout is None:
+            layout = PDF_LAYOUT_PARSING
+        page_layout = None
+        if layout and os.path.splitext(file_path)[1].lower() == ".pdf":
+            text, page_layout = ResumeParser._parse_pdf_layout(file_path)
+        else:
+            text = ResumeParser.extract_text(file_path)
         email = re.search(r'[\w\.-]+@[\w\.-]+', text)
         phone = re.search(r'\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}', text)
         
-        return {
+        data = {
             "text": text,
             "email": email.group(0) if email else "",
             "phone": phone.group(0) if phone else "",
@@ -19,6 +32,9 @@ class ResumeParser:
             "skills": {},
             "dt": []
         }
+        if page_layout is not None:
+            data["layout"] = page_layout
+        return data
 
     @staticmethod
     def extract_text(file_path: str) -> str:
@@ -34,6 +50,7 @@ class ResumeParser:
 
     @staticmethod
     def _parse_pdf(file_path: str) -> str:
+        from pypdf import PdfReader  # Lazy: keeps cold start fast for non-PDF requests
         text = ""
         try:
             reader = PdfReader(file_path)
@@ -43,8 +60,19 @@ class ResumeParser:
             raise ValueError(f"Error reading PDF: {str(e)}")
         return text.strip()
 
+    @staticmethod
+    @timed("parse_pdf_layout")
+    def _parse_pdf_layout(file_path: str) -> tuple:
+        from pypdf import PdfReader
+        import pdf_layout
+        try:
+            return pdf_layout.extract(PdfReader(file_path))
+        except Exception as e:
+            raise ValueError(f"Error reading PDF: {str(e)}")
+
     @staticmethod
     def _parse_docx(file_path: str) -> str:
+        from docx import Document
         text = ""
         try:
             doc = Document(file_path)
@@ -0,0 +1,17 @@
+"""
+Deployment environment detection, shared by every module that picks a storage path.
+
+Serverless platforms (Vercel, AWS Lambda) only allow writes under /tmp, and that
+/tmp is private to one instance.
+"""
+import os
+
+IS_SERVERLESS = bool(os.getenv("VERCEL")) or bool(os.getenv("VERCEL_ENV")) or bool(os.getenv("AWS_LAMBDA_FUNCTION_NAME"))
+if not IS_SERVERLESS:
+    # Double-check: detect read-only filesystem without touching it
+    IS_SERVERLESS = not os.access(os.getcwd(), os.W_OK)
+
+
+def data_path(local: str, serverless: str) -> str:
+    """`serverless` (a /tmp path) on serverless platforms, `local` otherwise."""
+    return serverless if IS_SERVERLESS else local
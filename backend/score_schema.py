@@ -0,0 +1,138 @@
+import re
+import json
+import logging
+from typing import List, Optional
+from pydantic import BaseModel, ValidationError, field_validator
+from metrics import timed
+
+logger = logging.getLogger(__name__)
+
+_decoder = json.JSONDecoder()
+_NUMBER_RE = re.compile(r"-?\d+(?:\.\d+)?")
+_LIST_SPLIT_RE = re.compile(r"[,;\n]")
+_EMPTY_VALUES = {"", "none", "n/a", "na", "null", "nil", "-"}
+
+
+def _to_percent(v) -> int:
+    """85, 85.5, "85", "85/100", "85%" -> 85, clamped to 0-100. Raises ValueError otherwise."""
+    if isinstance(v, str):
+        match = _NUMBER_RE.search(v)
+        if not match:
+            raise ValueError(f"no number in {v!r}")
+        v = match.group()
+    return max(0, min(int(float(v)), 100))
+
+
+def _keyword_list(v) -> List[str]:
+    """Models return keyword lists as CSV strings, "None", or [{"name": ...}]; keep the strings."""
+    if v is None:
+        return []
+    if isinstance(v, str):
+        v = _LIST_SPLIT_RE.split(v)
+    elif isinstance(v, dict):
+        v = [v]
+    elif not isinstance(v, list):
+        return []
+    cleaned = []
+    for item in v:
+        if isinstance(item, dict):
+            item = item.get("name") or item.get("skill") or item.get("keyword")
+        if not isinstance(item, str):
+            continue
+        item = item.strip().strip("-•*").strip()
+        if item.lower() not in _EMPTY_VALUES:
+            cleaned.append(item)
+    return cleaned
+
+# --- Typed model of the evaluate_resume JSON ---
+class KeywordAnalysis(BaseModel):
+    critical_missing: List[str] = []
+    recommended_missing: List[str] = []
+    hard_skills: List[str] = []
+    soft_skills: List[str] = []
+    keyword_stuffing_detected: List[str] = []
+    acronym_warnings: List[str] = []
+
+    @field_validator("*", mode="before")
+    @classmethod
+    def listify_keywords(cls, v):
+        return _keyword_list(v)
+
+class AIScoreResult(BaseModel):
+    score: int
+    summary: str = "Analysis complete."
+    section_scores: dict = {}
+    keywords: KeywordAnalysis = KeywordAnalysis()
+    content_analysis: dict = {}
+    feedback: List[str] = []
+
+    @field_validator("score", mode="before")
+    @classmethod
+    def clamp_score(cls, v):
+        return _to_percent(v)
+
+    @field_validator("summary", mode="before")
+    @classmethod
+    def default_summary(cls, v):
+        if v is None or (isinstance(v, str) and not v.strip()):
+            return "Analysis complete."
+        return v if isinstance(v, str) else str(v)
+
+    @field_validator("keywords", "content_analysis", mode="before")
+    @classmethod
+    def object_or_empty(cls, v):
+        return v if isinstance(v, dict) else {}
+
+    @field_validator("section_scores", mode="before")
+    @classmethod
+    def numeric_sections(cls, v):
+        if not isinstance(v, dict):
+            return {}
+        cleaned = {}
+        for k, val in v.items():
+            try:
+                cleaned[k] = _to_percent(val)
+            except (TypeError, ValueError):
+                continue
+        return cleaned
+
+    @field_validator("feedback", mode="before")
+    @classmethod
+    def listify_feedback(cls, v):
+        if isinstance(v, str):
+            return [v]
+        return [str(x) for x in v] if isinstance(v, list) else []
+
+
+def extract_json_object(text: str) -> Optional[dict]:
+    """
+    Find the first complete JSON object in an LLM response.
+    Tolerates markdown fences, preambles and trailing prose by
+    decoding in place from each '{' instead of requiring a clean string.
+    """
+    if not text:
+        return None
+    pos = text.find("{")
+    while pos != -1:
+        try:
+            obj, _ = _decoder.raw_decode(text, pos)
+            if isinstance(obj, dict):
+                return obj
+        except json.JSONDecodeError:
+            pass
+        pos = text.find("{", pos + 1)
+    return None
+
+
+@timed("json_decode")
+def parse_ai_score(text: str) -> Optional[AIScoreResult]:
+    """Extract and validate an AI score response. Returns None if unusable."""
+    obj = extract_json_object(text)
+    if obj is None:
+        logger.warning(f"⚠️  No JSON object found in AI response ({len(text or '')} chars)")
+        return None
+    try:
+        return AIScoreResult.model_validate(obj)
+    except (ValidationError, TypeError, ValueError) as e:
+        logger.warning(f"⚠️  AI score failed validation: {e}")
+        return None
@@ -0,0 +1,280 @@
+"""
+Semantic cache for /enhance.
+
+Inputs are embedded as hashed word + character-trigram vectors of their content
+words (CPU only, no model download) and compared by cosine similarity against
+previously enhanced texts of the same enhancement type. Candidates above
+SEMANTIC_CACHE_THRESHOLD reuse the stored enhancement instead of calling an LLM
+when they also pass a term guard: the same numbers ("by 20%" vs "by 50%"), the
+same content words (technologies, tools, objects), and at most
+SEMANTIC_CACHE_MAX_FILLER_DIFF differing filler words (generic action verbs and
+adverbs: "Built" vs "Developed", "using" vs "with").
+
+Vectors live in a fixed-capacity ring buffer memory-mapped from a .npy file;
+the texts and results are appended to a JSONL sidecar. Enable with SEMANTIC_CACHE=1.
+"""
+import os
+import re
+import json
+import zlib
+import logging
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+import metrics
+from runtime import data_path
+
+logger = logging.getLogger(__name__)
+
+SEMANTIC_CACHE = os.getenv("SEMANTIC_CACHE", "").lower() in ("1", "true", "yes")
+SEMANTIC_CACHE_PATH = os.getenv(
+    "SEMANTIC_CACHE_PATH",
+    data_path(os.path.join(os.path.dirname(__file__), "cache", "semantic"), "/tmp/semantic_cache")
+)
+SEMANTIC_CACHE_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", "10000"))
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.85"))
+SEMANTIC_CACHE_MAX_FILLER_DIFF = int(os.getenv("SEMANTIC_CACHE_MAX_FILLER_DIFF", "3"))
+EMBEDDING_DIM = 512
+
+_WORD_RE = re.compile(r"[a-z0-9+#]+")
+_NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)?")
+# Function words: ignored entirely
+_STOPWORDS = frozenset(
+    "a an the and or of to in on for with by at from as into via over using used use is are was were be "
+    "been this that these those it its our my their we i he she they".split()
+)
+# Words a paraphrase may swap without changing what was done or with what; up to
+# SEMANTIC_CACHE_MAX_FILLER_DIFF of them may differ. Every other word must match.
+_FILLER = frozenset(
+    "built build developed develop created create implemented implement engineered wrote coded designed "
+    "delivered produced established launched led managed headed oversaw spearheaded drove directed "
+    "worked collaborated partnered helped assisted contributed participated supported responsible "
+    "utilized utilizing leveraged leveraging employed employing applied "
+    "successfully effectively efficiently actively also various several multiple numerous "
+    "key new robust scalable high quality highly end".split()
+)
+
+try:
+    import fcntl  # POSIX: cross-process lock for a shared cache path
+except ImportError:
+    fcntl = None
+
+
+def _words(text: str) -> list:
+    """Lowercased non-stopword tokens with a trailing plural "s" dropped (APIs -> api)."""
+    words = []
+    for w in _WORD_RE.findall(text.lower()):
+        if w in _STOPWORDS:
+            continue
+        if len(w) > 3 and w.endswith("s") and not w.endswith("ss"):
+            w = w[:-1]
+        words.append(w)
+    return words
+
+
+def _features(text: str) -> list:
+    words = _words(text)
+    feats = [f"w:{w}" for w in words]
+    for w in words:
+        if w in _FILLER:
+            continue  # filler only counts as a whole word, so swapping it moves the vector little
+        padded = f"<{w}>"
+        feats.extend(f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2))
+    return feats
+
+
+def embed(text: str):
+    """L2-normalized hashed n-gram vector (float32, EMBEDDING_DIM)."""
+    import numpy as np
+    # crc32 rather than hash() so vectors stay valid across processes and restarts
+    idx = np.fromiter((zlib.crc32(f.encode()) % EMBEDDING_DIM for f in _features(text)), dtype=np.int64)
+    vec = np.log1p(np.bincount(idx, minlength=EMBEDDING_DIM).astype(np.float32))
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+
+def _numbers(text: str) -> list:
+    return _NUMBER_RE.findall(text)
+
+
+def _terms(text: str) -> tuple:
+    """(content words, filler words). Content words are technologies, tools and objects a reused rewrite must not swap."""
+    words = set(_words(text))
+    return frozenset(words - _FILLER), frozenset(words & _FILLER)
+
+
+def equivalent(a: str, b: str) -> bool:
+    """Term guard applied to every similarity candidate: same numbers, same content words, few filler swaps."""
+    if _numbers(a) != _numbers(b):
+        return False
+    content_a, filler_a = _terms(a)
+    content_b, filler_b = _terms(b)
+    return content_a == content_b and len(filler_a ^ filler_b) <= SEMANTIC_CACHE_MAX_FILLER_DIFF
+
+
+class SemanticCache:
+    """Thread- and process-safe similarity cache with mmap-persisted vectors. path=None keeps it in memory."""
+
+    def __init__(self, path: str = None, capacity: int = SEMANTIC_CACHE_SIZE, threshold: float = SEMANTIC_CACHE_THRESHOLD):
+        import numpy as np
+        self.path = path
+        self.capacity = capacity
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._reset()
+
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            if fcntl is None:
+                self.path = path = f"{path}.{os.getpid()}"  # no file locks: don't share with other processes
+            self._lock_file = open(path + ".lock", "a+")
+            with self._file_lock(exclusive=True):
+                self.vectors = self._open_vectors(path + ".npy")
+                self._sync()
+                live = sum(e is not None for e in self._entries)
+                if self._lines > 2 * max(live, 1):
+                    self._rewrite()
+            logger.info(f"🧠 Semantic cache loaded: {live} entries from {path}.jsonl")
+        else:
+            self.vectors = np.zeros((capacity, EMBEDDING_DIM), dtype=np.float32)
+
+    def _reset(self):
+        import numpy as np
+        self._entries = [None] * self.capacity     # slot -> {"ns", "text", "result"}
+        self._ns_ids = np.full(self.capacity, -1, dtype=np.int32)
+        self._namespaces = {}
+        self._next_slot = 0
+        self._size = 0                              # slots are filled in order, so [0, _size) are live
+        self._lines = 0
+        self._meta_offset = 0                       # sidecar bytes already applied
+        self._meta_ino = None
+
+    @contextmanager
+    def _file_lock(self, exclusive: bool):
+        if not self.path:
+            yield
+            return
+        fcntl.flock(self._lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _open_vectors(self, vec_path: str):
+        from numpy.lib.format import open_memmap
+        shape = (self.capacity, EMBEDDING_DIM)
+        if os.path.exists(vec_path):
+            try:
+                vectors = open_memmap(vec_path, mode="r+")
+                if vectors.shape == shape:
+                    return vectors
+            except ValueError:
+                pass
+            logger.warning(f"⚠️  Semantic cache at {vec_path} has a different shape, starting fresh")
+            if os.path.exists(self.path + ".jsonl"):
+                os.remove(self.path + ".jsonl")
+        return open_memmap(vec_path, mode="w+", dtype="float32", shape=shape)
+
+    def _ns_id(self, ns: str) -> int:
+        return self._namespaces.setdefault(ns, len(self._namespaces))
+
+    def _sync(self):
+        """Apply sidecar lines appended since the last sync (by any process). Call with the file lock held."""
+        meta_path = self.path + ".jsonl"
+        try:
+            st = os.stat(meta_path)
+        except FileNotFoundError:
+            return
+        if st.st_ino != self._meta_ino or st.st_size < self._meta_offset:
+            self._reset()  # first sync, or another process compacted the sidecar
+            self._meta_ino = st.st_ino
+        if st.st_size == self._meta_offset:
+            return
+        with open(meta_path, "rb") as f:
+            f.seek(self._meta_offset)
+            data = f.read()
+        end = data.rfind(b"\n") + 1  # a trailing partial line is picked up once complete
+        for line in data[:end].splitlines():
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # torn write from a crash
+            slot = entry.pop("slot")
+            if not 0 <= slot < self.capacity:
+                continue
+            self._entries[slot] = entry
+            self._ns_ids[slot] = self._ns_id(entry["ns"])
+            self._size = max(self._size, slot + 1)
+            self._next_slot = (slot + 1) % self.capacity
+            self._lines += 1
+        self._meta_offset += end
+
+    def _rewrite(self):
+        """Drop overwritten ring slots from the sidecar, keeping the newest slot last. Needs the exclusive lock."""
+        meta_path = self.path + ".jsonl"
+        last_slot = (self._next_slot - 1) % self.capacity
+        order = [s for s in range(last_slot + 1, self.capacity)] + [s for s in range(last_slot + 1)]
+        tmp = meta_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for slot in order:
+                if self._entries[slot] is not None:
+                    f.write(json.dumps({"slot": slot, **self._entries[slot]}) + "\n")
+        os.replace(tmp, meta_path)
+        st = os.stat(meta_path)
+        self._meta_ino, self._meta_offset = st.st_ino, st.st_size
+        self._lines = sum(e is not None for e in self._entries)
+
+    def lookup(self, ns: str, text: str):
+        """Cached enhancement for a similar text in the same namespace, or None."""
+        import numpy as np
+        query = embed(text)
+        with self._lock, self._file_lock(exclusive=False):
+            if self.path:
+                self._sync()
+            ns_id = self._namespaces.get(ns)
+            hit = None
+            if ns_id is not None:
+                sims = self.vectors[:self._size] @ query
+                sims[self._ns_ids[:self._size] != ns_id] = -1.0
+                for slot in np.argsort(-sims)[:8]:
+                    if sims[slot] < self.threshold:
+                        break
+                    entry = self._entries[slot]
+                    if equivalent(entry["text"], text):
+                        hit = entry["result"]
+                        break
+        metrics.record_cache("semantic_enhance", hit is not None)
+        return hit
+
+    def add(self, ns: str, text: str, result: str):
+        vector = embed(text)
+        entry = {"ns": ns, "text": text, "result": result}
+        with self._lock, self._file_lock(exclusive=True):
+            if self.path:
+                self._sync()  # another process may have taken the slots we would use next
+            slot = self._next_slot
+            self._next_slot = (slot + 1) % self.capacity
+            self.vectors[slot] = vector
+            self._entries[slot] = entry
+            self._ns_ids[slot] = self._ns_id(ns)
+            self._size = max(self._size, slot + 1)
+            if self.path:
+                # Vector first, then the sidecar line that makes the slot visible on reload
+                self.vectors.flush()
+                with open(self.path + ".jsonl", "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"slot": slot, **entry}) + "\n")
+                    self._meta_offset = f.tell()
+                    self._meta_ino = os.fstat(f.fileno()).st_ino
+                self._lines += 1
+
+
+@lru_cache(maxsize=1)
+def get_cache():
+    """The process-wide cache, or None when SEMANTIC_CACHE is off."""
+    if not SEMANTIC_CACHE:
+        return None
+    try:
+        return SemanticCache(SEMANTIC_CACHE_PATH or None)
+    except OSError as e:
+        logger.warning(f"⚠️  Semantic cache not persistent ({str(e)}), using memory only")
+        return SemanticCache(None)
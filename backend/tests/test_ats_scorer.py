@@ -0,0 +1,43 @@
+from ats_analyzer import ATSAnalyzer
+from ats_scorer import ATSScorer
+
+RESUME = """Jane Doe
+jane@example.com | +1 555 010 2030 | Berlin
+Summary
+Backend engineer with 6 years building Python and FastAPI services on AWS.
+Experience
+Senior Engineer, Acme Corp, 2019 - 2024
+- Built REST APIs with Python, FastAPI and PostgreSQL serving 2M requests/day
+- Ran services on Docker and Kubernetes with CI/CD pipelines, cutting deploy time by 40%
+Education
+B.Sc. Computer Science, TU Berlin, 2014 - 2018
+Skills
+Python, FastAPI, PostgreSQL, Docker, Kubernetes, AWS, Redis
+Projects
+Open-source rate limiter for FastAPI
+"""
+
+BACKEND_JD = """Senior Backend Engineer
+Requirements: Python, FastAPI, PostgreSQL, Docker, Kubernetes, AWS, REST API design, CI/CD.
+Nice to have: Kafka, Redis, Terraform."""
+
+NURSE_JD = """Registered Nurse
+Requirements: BLS certification, patient care, Epic EHR, ICU experience, Medication Administration."""
+
+
+def _fallback(job_description: str) -> dict:
+    mechanical = ATSAnalyzer().analyze_mechanical_compliance(RESUME, {"file_size": 40000})
+    return ATSScorer._combine(RESUME, job_description, mechanical, {})
+
+
+def test_heuristic_stays_in_ai_range():
+    assert 50 <= ATSScorer._heuristic_score(RESUME, BACKEND_JD) <= 85
+    assert ATSScorer._heuristic_score(RESUME, "") <= 70
+
+
+def test_fallback_score_range():
+    matching, mismatched = _fallback(BACKEND_JD), _fallback(NURSE_JD)
+    assert "heuristic_keywords" in matching["section_scores"]
+    assert 60 <= matching["score"] <= 90
+    assert mismatched["score"] <= 75
+    assert matching["score"] - mismatched["score"] >= 10
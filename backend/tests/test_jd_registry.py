@@ -0,0 +1,39 @@
+from jd_registry import preprocess
+
+JD = """Senior Backend Engineer
+
+Requirements:
+- 5+ years of Python
+- Experience with Docker
+Benefits include stock options and Python training budget
+Plus experience with Kubernetes and Terraform
+Skills in Postgres, Kafka and SQL are expected
+
+Nice to have
+- GraphQL
+
+## Benefits
+- Free lunch
+"""
+
+
+def test_sentences_starting_with_header_words_stay_content():
+    jd = preprocess(JD)
+    assert "Benefits include stock options and Python training budget" in jd.clean_text
+    assert "Plus experience with Kubernetes and Terraform" in jd.clean_text
+    for kw in ("Kubernetes", "Terraform", "Postgres", "Kafka", "SQL"):
+        assert kw in jd.critical, kw
+        assert kw not in jd.recommended, kw
+
+
+def test_exact_and_marked_headers_switch_sections():
+    jd = preprocess(JD)
+    assert "GraphQL" in jd.recommended
+    assert "Free lunch" not in jd.clean_text
+    assert "Docker" in jd.critical
+
+
+def test_inline_label():
+    jd = preprocess("Must have: Docker\nPreferred: Rust\n")
+    assert jd.critical == ["Docker"]
+    assert jd.recommended == ["Rust"]
@@ -0,0 +1,52 @@
+import io
+
+from fpdf import FPDF
+from pypdf import PdfReader
+
+import pdf_layout
+
+LEFT = ["Experience", "Senior Engineer at Acme", "Built billing APIs in Python", "Led migration to AWS",
+        "Engineer at Globex", "Maintained Kafka pipelines", "Wrote Terraform modules"]
+RIGHT = ["Skills", "Python", "Go", "Docker", "Kubernetes", "PostgreSQL", "Redis"]
+TABLE = [("Certification", "Issuer", "Year"), ("AWS Architect", "Amazon", "2021"),
+         ("CKA", "CNCF", "2022"), ("Terraform Associate", "HashiCorp", "2023")]
+
+
+def _pdf(two_columns: bool = True, table: bool = True) -> PdfReader:
+    pdf = FPDF(unit="pt", format="letter")
+    pdf.add_page()
+    pdf.set_font("Helvetica", size=10)
+    pdf.text(250, 50, "Jane Doe")
+    y = 90
+    if two_columns:
+        for i, (left, right) in enumerate(zip(LEFT, RIGHT)):
+            pdf.text(50, y + i * 14, left)
+            pdf.text(360, y + i * 14, right)
+        y += len(LEFT) * 14 + 40
+    if table:
+        for i, row in enumerate(TABLE):
+            for x, cell in zip((50, 250, 450), row):
+                pdf.text(x, y + i * 14, cell)
+    return PdfReader(io.BytesIO(bytes(pdf.output())))
+
+
+def test_two_column_section_above_table():
+    text, layout = pdf_layout.extract(_pdf())
+    assert layout["columns"] == 2
+    assert len(layout["tables"]) == 1 and layout["tables"][0]["columns"] == 3
+    lines = text.splitlines()
+    # Columns read one after the other, table rows kept whole
+    assert lines.index("Wrote Terraform modules") < lines.index("Skills")
+    assert "AWS Architect Amazon 2021" in lines
+
+
+def test_whole_page_columns():
+    text, layout = pdf_layout.extract(_pdf(table=False))
+    assert layout["columns"] == 2
+    assert text.splitlines()[0] == "Jane Doe"
+
+
+def test_table_alone_is_not_columns():
+    _, layout = pdf_layout.extract(_pdf(two_columns=False))
+    assert layout["columns"] == 1
+    assert layout["tables"][0]["rows"] == 4
@@ -0,0 +1,47 @@
+import json
+
+from score_schema import parse_ai_score
+
+
+def _parse(payload: dict):
+    return parse_ai_score("Here is the evaluation:\n" + json.dumps(payload))
+
+
+def test_fraction_score_and_string_sections():
+    result = _parse({"score": "85/100", "section_scores": {"keywords": "70%", "format": "n/a"}})
+    assert result.score == 85
+    assert result.section_scores == {"keywords": 70}
+
+
+def test_none_string_keyword_list():
+    result = _parse({"score": 72, "keywords": {"critical_missing": "None", "recommended_missing": "N/A"}})
+    assert result.keywords.critical_missing == []
+    assert result.keywords.recommended_missing == []
+
+
+def test_comma_separated_keyword_string():
+    result = _parse({"score": 60, "keywords": {"critical_missing": "Kubernetes, Terraform; AWS"}})
+    assert result.keywords.critical_missing == ["Kubernetes", "Terraform", "AWS"]
+
+
+def test_keyword_dicts_and_non_strings():
+    result = _parse({"score": 90, "keywords": {
+        "hard_skills": [{"name": "Python", "level": "expert"}, {"skill": "SQL"}, 3, None, "Docker"],
+        "soft_skills": {"name": "Leadership"},
+    }})
+    assert result.keywords.hard_skills == ["Python", "SQL", "Docker"]
+    assert result.keywords.soft_skills == ["Leadership"]
+
+
+def test_null_summary_and_wrong_container_types():
+    result = _parse({"score": 50, "summary": None, "keywords": [], "content_analysis": "good", "feedback": "Add metrics"})
+    assert result.summary == "Analysis complete."
+    assert result.keywords.critical_missing == []
+    assert result.content_analysis == {}
+    assert result.feedback == ["Add metrics"]
+
+
+def test_unusable_score_is_rejected():
+    assert _parse({"score": "excellent"}) is None
+    assert _parse({"summary": "no score"}) is None
+    assert parse_ai_score("no json here") is None
@@ -0,0 +1,44 @@
+import pytest
+
+from semantic_cache import SemanticCache
+
+
+@pytest.fixture
+def cache():
+    c = SemanticCache(None, capacity=64)
+    c.add("bullet", "Developed REST APIs using Python and Flask", "REWRITE-FLASK")
+    c.add("bullet", "Led a team of 5 engineers to migrate billing to AWS", "REWRITE-AWS")
+    c.add("bullet", "Reduced page load time by 20% with lazy loading", "REWRITE-20")
+    return c
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("developed REST APIs with Python and Flask.", "REWRITE-FLASK"),
+    ("Built REST APIs with Python and Flask", "REWRITE-FLASK"),
+    ("Successfully implemented REST API using Python and Flask", "REWRITE-FLASK"),
+    ("Managed a team of 5 engineers to migrate billing to AWS", "REWRITE-AWS"),
+])
+def test_paraphrase_hits(cache, text, expected):
+    assert cache.lookup("bullet", text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "Developed REST APIs using Go and Flask",                      # different technology
+    "Developed REST APIs using Python and Django",
+    "Led a team of 8 engineers to migrate billing to AWS",        # different number
+    "Led a team of 5 engineers to migrate billing to Azure",
+    "Tested REST APIs using Python and Flask",                     # different action, not a filler verb
+    "Reduced page load time by 50% with lazy loading",
+])
+def test_content_changes_miss(cache, text):
+    assert cache.lookup("bullet", text) is None
+
+
+def test_namespaces_are_separate(cache):
+    assert cache.lookup("summary", "Developed REST APIs using Python and Flask") is None
+
+
+def test_persisted_cache_reloads(tmp_path):
+    path = str(tmp_path / "semantic")
+    SemanticCache(path, capacity=16).add("bullet", "Built dashboards in Tableau", "REWRITE")
+    assert SemanticCache(path, capacity=16).lookup("bullet", "Created dashboards using Tableau") == "REWRITE"
@@ -35,6 +35,17 @@ export const enhanceText = async (text, type = "general", jobDescription = "", p
     return response.data;
 };
 
+// segments: [{ id, text, type }] -> { results: [{ index, id, type, original, enhanced }] } in one round trip
+export const enhanceBatch = async (segments, jobDescription = "", provider = "openai") => {
+    const response = await api.post('/enhance/batch', { segments, job_description: jobDescription, provider }, {
+        headers: { 'Content-Type': 'application/json' }
+    });
+    return response.data;
+};
+
+// Generated files come back as /output/<name>, or inlined as data: URLs on serverless
+export const fileHref = (url) => (url.startsWith('data:') ? url : `${API_URL}${url}`);
+
 export const generateResume = async (data, format = "pdf", template = "classic") => {
     try {
         const response = await api.post('/generate', { data, format, template }, {
@@ -46,9 +57,31 @@ export const generateResume = async (data, format = "pdf", template = "classic")
     }
 };
 
-export const sendChatMessage = async (message, context, provider = "openai") => {
-    const response = await api.post('/chat', { message, context, provider }, {
+// outputs: [{ format: "pdf", template: "modern" }, { format: "docx" }]; bundle adds a zip of all files
+export const exportResume = async (data, outputs, bundle = false) => {
+    try {
+        const response = await api.post('/generate', { data, outputs, bundle }, {
+            headers: { 'Content-Type': 'application/json' }
+        });
+        return response.data;
+    } catch (error) {
+        throw error.response ? error.response.data : new Error('Network Error');
+    }
+};
+
+export const sendChatMessage = async (message, context, provider = "openai", sessionId = null) => {
+    const post = (body) => api.post('/chat', { message, provider, ...body }, {
         headers: { 'Content-Type': 'application/json' }
     });
-    return response.data;
+    try {
+        const response = await post(sessionId ? { session_id: sessionId } : { context });
+        return response.data;
+    } catch (error) {
+        // Sessions live in server memory; start a new one with the full context if it expired
+        if (sessionId && error.response?.status === 404) {
+            const response = await post({ context });
+            return response.data;
+        }
+        throw error;
+    }
 };
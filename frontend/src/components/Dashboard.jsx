@@ -1,10 +1,11 @@
 import React, { useState } from 'react';
-import { generateResume, enhanceText, scoreResume, sendChatMessage, API_URL } from '../api';
+import { generateResume, exportResume, enhanceText, scoreResume, sendChatMessage, fileHref, API_URL } from '../api';
 
 const Dashboard = ({ data, onBack }) => {
     const [resumeData, setResumeData] = useState(data);
     const [generating, setGenerating] = useState(false);
     const [downloadUrl, setDownloadUrl] = useState('');
+    const [downloadName, setDownloadName] = useState('');
     const [format, setFormat] = useState('pdf');
     const [template, setTemplate] = useState('classic');
 
@@ -22,6 +23,7 @@ const Dashboard = ({ data, onBack }) => {
     const [chatMessages, setChatMessages] = useState([]);
     const [chatInput, setChatInput] = useState("");
     const [chatLoading, setChatLoading] = useState(false);
+    const [chatSession, setChatSession] = useState({ id: null, context: "" });
 
     const handleChatSend = async () => {
         if (!chatInput.trim()) return;
@@ -44,7 +46,10 @@ const Dashboard = ({ data, onBack }) => {
             ${jobDescription}
             `;
 
-            const result = await sendChatMessage(userMsg, context);
+            // Reuse the server-side session until the resume or job description changes
+            const sessionId = chatSession.context === context ? chatSession.id : null;
+            const result = await sendChatMessage(userMsg, context, "openai", sessionId);
+            setChatSession({ id: result.session_id, context });
             setChatMessages(prev => [...prev, { role: 'ai', content: result.reply }]);
         } catch (err) {
             console.error(err);
@@ -139,8 +144,22 @@ const Dashboard = ({ data, onBack }) => {
                 projects: []
             };
 
-            const result = await generateResume(mockData, format, template);
-            setDownloadUrl(result.url);
+            if (format === 'all') {
+                // Every template + DOCX rendered concurrently server-side, downloaded as one zip
+                const outputs = [
+                    { format: 'pdf', template: 'classic' },
+                    { format: 'pdf', template: 'modern' },
+                    { format: 'pdf', template: 'minimal' },
+                    { format: 'docx' },
+                ];
+                const result = await exportResume(mockData, outputs, true);
+                setDownloadUrl(result.zip.url);
+                setDownloadName(result.zip.filename);
+            } else {
+                const result = await generateResume(mockData, format, template);
+                setDownloadUrl(result.url);
+                setDownloadName(result.filename);
+            }
         } catch (err) {
             console.error(err);
             const errorMessage = err.detail || 'Generation failed. Please try again.';
@@ -351,6 +370,7 @@ const Dashboard = ({ data, onBack }) => {
                     <select value={format} onChange={(e) => setFormat(e.target.value)} style={{ width: 'auto', marginBottom: 0 }}>
                         <option value="pdf">PDF (LaTeX)</option>
                         <option value="docx">Word (DOCX)</option>
+                        <option value="all">All templates + DOCX (ZIP)</option>
                     </select>
 
                     {format === 'pdf' && (
@@ -368,12 +388,14 @@ const Dashboard = ({ data, onBack }) => {
 
                 {downloadUrl && (
                     <div style={{ display: 'flex', gap: '1rem', marginTop: '1rem' }}>
-                        <a href={`${API_URL}${downloadUrl}`} download style={{ display: 'inline-block', padding: '0.8rem 1.5rem', background: '#3b82f6', color: 'white', textDecoration: 'none', borderRadius: '5px', fontWeight: 'bold' }}>
+                        <a href={fileHref(downloadUrl)} download={downloadName} style={{ display: 'inline-block', padding: '0.8rem 1.5rem', background: '#3b82f6', color: 'white', textDecoration: 'none', borderRadius: '5px', fontWeight: 'bold' }}>
                             Download Resume
                         </a>
-                        <a href={`mailto:?subject=My Resume&body=Please find my attached resume here: ${API_URL}${downloadUrl}`} style={{ display: 'inline-block', padding: '0.8rem 1.5rem', background: '#64748b', color: 'white', textDecoration: 'none', borderRadius: '5px', fontWeight: 'bold' }}>
-                            Email to Self
-                        </a>
+                        {!downloadUrl.startsWith('data:') && (
+                            <a href={`mailto:?subject=My Resume&body=Please find my attached resume here: ${API_URL}${downloadUrl}`} style={{ display: 'inline-block', padding: '0.8rem 1.5rem', background: '#64748b', color: 'white', textDecoration: 'none', borderRadius: '5px', fontWeight: 'bold' }}>
+                                Email to Self
+                            </a>
+                        )}
                     </div>
                 )}
             </div>
@@ -1,5 +1,5 @@
 import React, { useState } from 'react';
-import { uploadResume, enhanceText } from '../api';
+import { uploadResume, enhanceBatch } from '../api';
 
 const ManualEntryForm = ({ onSubmit, loading }) => {
     const [formData, setFormData] = useState({
@@ -64,43 +64,71 @@ const ManualEntryForm = ({ onSubmit, loading }) => {
         setFormData(prev => ({ ...prev, [field]: prev[field].filter((_, i) => i !== index) }));
     };
 
-    const handleEnhance = async (field, index = null, subfield = null) => {
+    // One enhanceable text: the summary, an experience entry's details or a project's description
+    const segmentFor = (field, index = null, subfield = null) => {
         const key = index !== null ? `${field}-${index}-${subfield}` : field;
-        setEnhancing(prev => ({ ...prev, [key]: true }));
-        try {
-            let text = "";
-            let type = "general";
-
-            if (field === 'summary') {
-                text = formData.summary;
-                type = "summary";
-            } else if (field === 'experience') {
-                text = formData.experience[index][subfield];
-                type = "bullet_points";
-            } else if (field === 'projects') {
-                text = formData.projects[index][subfield];
-                type = "bullet_points";
-            }
-
-            if (!text || text.length < 10) {
-                alert("Please enter some text (at least 10 chars) first to enhance.");
-                setEnhancing(prev => ({ ...prev, [key]: false }));
-                return;
-            }
+        const text = index !== null ? formData[field][index][subfield] : formData[field];
+        return { key, field, index, subfield, text, type: field === 'summary' ? 'summary' : 'bullet_points' };
+    };
 
-            const result = await enhanceText(text, type, formData.jobDescription);
-            if (result && result.enhanced) {
-                if (index !== null) {
-                    handleArrayChange(field, index, subfield, result.enhanced);
+    // Enhance several fields with one /enhance/batch request and write the results back
+    const applyEnhancements = async (targets) => {
+        const { results } = await enhanceBatch(
+            targets.map(t => ({ id: t.key, text: t.text, type: t.type })),
+            formData.jobDescription
+        );
+        setFormData(prev => {
+            const next = { ...prev };
+            for (const result of results) {
+                const t = targets[result.index];
+                if (!result.enhanced) continue;
+                if (t.index !== null) {
+                    next[t.field] = [...next[t.field]];
+                    next[t.field][t.index] = { ...next[t.field][t.index], [t.subfield]: result.enhanced };
                 } else {
-                    setFormData(prev => ({ ...prev, [field]: result.enhanced }));
+                    next[t.field] = result.enhanced;
                 }
             }
+            return next;
+        });
+    };
+
+    const handleEnhance = async (field, index = null, subfield = null) => {
+        const target = segmentFor(field, index, subfield);
+        if (!target.text || target.text.length < 10) {
+            alert("Please enter some text (at least 10 chars) first to enhance.");
+            return;
+        }
+        setEnhancing(prev => ({ ...prev, [target.key]: true }));
+        try {
+            await applyEnhancements([target]);
         } catch (err) {
             console.error("Enhancement failed:", err);
             alert("Failed to enhance text. Please check the console or try again.");
         } finally {
-            setEnhancing(prev => ({ ...prev, [key]: false }));
+            setEnhancing(prev => ({ ...prev, [target.key]: false }));
+        }
+    };
+
+    const handleEnhanceAll = async () => {
+        const targets = [
+            segmentFor('summary'),
+            ...formData.experience.map((_, i) => segmentFor('experience', i, 'details')),
+            ...formData.projects.map((_, i) => segmentFor('projects', i, 'description')),
+        ].filter(t => t.text && t.text.length >= 10);
+        if (targets.length === 0) {
+            alert("Please enter some text (at least 10 chars) first to enhance.");
+            return;
+        }
+        const flags = Object.fromEntries(targets.map(t => [t.key, true]));
+        setEnhancing(prev => ({ ...prev, ...flags, all: true }));
+        try {
+            await applyEnhancements(targets);
+        } catch (err) {
+            console.error("Enhancement failed:", err);
+            alert("Failed to enhance text. Please check the console or try again.");
+        } finally {
+            setEnhancing(prev => ({ ...prev, ...Object.fromEntries(targets.map(t => [t.key, false])), all: false }));
         }
     };
 
@@ -859,7 +887,19 @@ const ManualEntryForm = ({ onSubmit, loading }) => {
                 </div>
             </div>
 
-            <button type="submit" disabled={loading} style={{ width: '100%', marginTop: '2rem', padding: '1rem', fontSize: '1.1rem' }}>
+            <button
+                type="button"
+                onClick={handleEnhanceAll}
+                disabled={enhancing['all']}
+                style={{
+                    width: '100%', marginTop: '2rem', padding: '0.8rem', fontSize: '1rem',
+                    background: 'linear-gradient(135deg, #6366f1, #8b5cf6)', color: 'white', border: 'none'
+                }}
+            >
+                {enhancing['all'] ? '✨ Improving all sections...' : '✨ Enhance Summary, Experience & Projects with AI'}
+            </button>
+
+            <button type="submit" disabled={loading} style={{ width: '100%', marginTop: '1rem', padding: '1rem', fontSize: '1.1rem' }}>
                 {loading ? 'Processing...' : 'Generate Resume'}
             </button>
         </form >